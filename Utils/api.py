@@ -0,0 +1,106 @@
+# api.py - JSON prediction and bulk report endpoints for machine clients (no Dash roundtrip)
+
+from flask import Response, jsonify, request, stream_with_context
+
+from config import API_MAX_BATCH, MODEL_READY_TIMEOUT
+from Utils.labels import decode_records
+from Utils.report_generator import iter_reports_pdf, iter_reports_zip
+from Utils.validation import FEATURES, validate_records
+
+# POST /api/v1/reports ?format= -> (stream builder, mimetype, download name)
+REPORT_FORMATS = {
+    'zip': (iter_reports_zip, 'application/zip', 'neuropredict_reports.zip'),
+    'pdf': (iter_reports_pdf, 'application/pdf', 'neuropredict_reports.pdf'),
+}
+
+
+def register_api(server, handler):
+    """
+    POST /api/v1/predict
+
+    Single patient - a JSON object of feature values:
+        {"Age": 72, "Gender": 1, ...}
+        -> {"prediction": 1, "probability": 0.87, "version": "..."}
+
+    Batch - a JSON array of such objects, or {"records": [...]}:
+        -> {"predictions": [1, 0, ...], "probabilities": [0.87, 0.12, ...], "version": "..."}
+
+    POST /api/v1/reports?format=zip|pdf
+
+    A batch as above -> the PDF reports of every record, streamed as they
+    are rendered: a ZIP of one PDF per record (default) or one multi-page PDF.
+
+    Every feature in config.FEATURE_GROUPS is required and range-checked;
+    invalid input returns 422 with per-row errors.
+    """
+
+    def read_records():
+        """(records, None) from the request body, or (None, error response)."""
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict) and isinstance(payload.get('records'), list):
+            payload = payload['records']
+
+        records = [payload] if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            return None, (jsonify(error="Body must be a JSON object or an array of objects"), 400)
+        if not records:
+            return None, (jsonify(error="No records given"), 400)
+        if len(records) > API_MAX_BATCH:
+            return None, (jsonify(error=f"At most {API_MAX_BATCH} records per request"), 413)
+
+        errors = validate_records(records)
+        if errors:
+            return None, (jsonify(error="Invalid input", details=errors), 422)
+
+        if not handler.ensure_loaded(timeout=MODEL_READY_TIMEOUT):
+            status = 503 if handler.status == 'loading' else 500
+            return None, (jsonify(error=handler.load_error or "Model is still loading"), status)
+        return records, None
+
+    @server.route('/api/v1/predict', methods=['POST'])
+    def api_predict():
+        payload = request.get_json(silent=True)
+        single = isinstance(payload, dict) and not isinstance(payload.get('records'), list)
+        records, error = read_records()
+        if error:
+            return error
+
+        active = handler.active()
+        if single:
+            # Encoded like a batch row, so both shapes of request score the same features
+            result = handler.predict(active.encode_record(records[0]), active)
+            return jsonify(prediction=result['prediction'], probability=result['probability'],
+                           version=result['version'])
+
+        result = active.predict_batch(records)
+        return jsonify(predictions=result['prediction'].tolist(),
+                       probabilities=result['probability'].tolist(),
+                       version=result['version'])
+
+    @server.route('/api/v1/reports', methods=['POST'])
+    def api_reports():
+        report_format = request.args.get('format', 'zip')
+        if report_format not in REPORT_FORMATS:
+            return jsonify(error=f"format must be one of {', '.join(REPORT_FORMATS)}"), 400
+        records, error = read_records()
+        if error:
+            return error
+
+        active = handler.active()
+        scored = active.predict_batch(records)
+
+        # Reports list the form fields in form order, whatever else a record carries;
+        # option values go back to their labels for the whole batch in one pass
+        readable = decode_records([active.encode_record({name: record[name] for name in FEATURES})
+                                   for record in records])
+
+        def items():
+            for i, input_data in enumerate(readable):
+                result = {'prediction': int(scored['prediction'][i]),
+                          'probability': float(scored['probability'][i]),
+                          'is_positive': bool(scored['is_positive'][i])}
+                yield input_data, result
+
+        stream, mimetype, filename = REPORT_FORMATS[report_format]
+        return Response(stream_with_context(stream(items())), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
@@ -0,0 +1,173 @@
+# bulk_scoring.py - Offline scoring of CSV / Parquet rosters in bounded memory
+#
+#   python -m Utils.bulk_scoring data/alzheimers_disease_data.csv scores.csv
+#   python -m Utils.bulk_scoring roster.parquet scores.parquet --chunk-size 100000 --workers 4
+
+import argparse
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from config import FEATURE_GROUPS, MODEL_FILE
+from Utils.model_handler import LoadedModel
+
+FORM_FEATURES = [f['name'] for group in FEATURE_GROUPS.values() for f in group['features']]
+
+# Worker-process model, loaded once by _init_worker
+_model = None
+
+
+def read_chunks(path, chunk_size, columns):
+    """Yield DataFrames of at most chunk_size rows holding only `columns` (those present)."""
+    wanted = set(columns)
+
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Reading Parquet needs pyarrow. Run: pip install pyarrow")
+
+        parquet = pq.ParquetFile(path)
+        present = [c for c in parquet.schema_arrow.names if c in wanted]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=present):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=lambda c: c in wanted)
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if self.path.endswith('.parquet'):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                sys.exit("Writing Parquet needs pyarrow. Run: pip install pyarrow")
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                      header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def score_chunk(model, chunk, id_column=None):
+    """
+    Score one chunk: form features are mapped by name, every other column is
+    ignored and model features the roster lacks default to 0, as in the UI.
+    """
+    features = chunk[[c for c in chunk.columns if c in FORM_FEATURES]]
+    X = features.reindex(columns=model.feature_names, fill_value=0).to_numpy()
+    result = model.predict_batch(X)
+
+    out = pd.DataFrame({
+        'prediction': result['prediction'],
+        'probability': result['probability'],
+        'model_version': result['version'],
+    })
+    if id_column and id_column in chunk.columns:
+        out.insert(0, id_column, chunk[id_column].to_numpy())
+    return out
+
+
+def _pool_context():
+    """
+    forkserver where the platform has it, else spawn: never fork the caller,
+    which may be running threads (the app's model loader or registry
+    watcher) half-way through an import. The server preloads this module,
+    so each worker only has to load the model.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _init_worker(model_file):
+    global _model
+    _model = LoadedModel.from_file(model_file)
+
+
+def _score_in_worker(chunk, id_column):
+    return score_chunk(_model, chunk, id_column)
+
+
+def score_file(input_path, output_path, model_file=MODEL_FILE, chunk_size=50_000,
+               workers=1, id_column='PatientID'):
+    """
+    Stream input_path through the model and write predictions to output_path.
+    At most 2 * workers chunks are in flight, so memory stays bounded by the
+    chunk size rather than the file size. Returns the number of rows scored.
+    """
+    columns = FORM_FEATURES + ([id_column] if id_column else [])
+    chunks = read_chunks(input_path, chunk_size, columns)
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+
+    try:
+        if workers <= 1:
+            model = LoadedModel.from_file(model_file)
+            for chunk in chunks:
+                scored = score_chunk(model, chunk, id_column)
+                writer.write(scored)
+                n_rows += len(scored)
+            return n_rows
+
+        with ProcessPoolExecutor(workers, mp_context=_pool_context(), initializer=_init_worker,
+                                 initargs=(model_file,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_score_in_worker, chunk, id_column))
+                if len(pending) >= 2 * workers:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    n_rows += len(scored)
+            while pending:
+                scored = pending.popleft().result()
+                writer.write(scored)
+                n_rows += len(scored)
+        return n_rows
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a patient roster (CSV or Parquet) in chunks.")
+    parser.add_argument('input', help="input .csv or .parquet with the dataset's column names")
+    parser.add_argument('output', help="output .csv or .parquet for the predictions")
+    parser.add_argument('--model', default=MODEL_FILE, help="model file or compiled model directory")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="score chunks on N processes")
+    parser.add_argument('--id-column', default='PatientID',
+                        help="column copied through to the output, if present ('' to disable)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"input file '{args.input}' not found")
+
+    n_rows = score_file(args.input, args.output, args.model, args.chunk_size,
+                        args.workers, args.id_column or None)
+    print(f"✓ Scored {n_rows} rows into {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# cache.py - Caches shared by workers and background jobs: chat replies, chat history, reports
+#
+# create_cache picks a diskcache directory when one is configured, else an
+# in-process PredictionCache that only the current process can see.
+
+from Utils.prediction_cache import PredictionCache
+
+
+class DiskCache:
+    """
+    diskcache-backed LRU/TTL cache with the PredictionCache interface, shared
+    by every process that opens the same directory (workers and background jobs).
+    """
+
+    def __init__(self, directory, maxsize=1024, ttl=3600, entry_bytes=16 * 1024):
+        import diskcache
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # diskcache bounds bytes, not entries: budget entry_bytes per entry
+        self._cache = diskcache.Cache(directory, size_limit=max(maxsize, 1) * entry_bytes,
+                                      eviction_policy='least-recently-used')
+        self._cache.stats(enable=True)
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+        return self._cache.get(key)
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._cache.set(key, value, expire=self.ttl if self.ttl > 0 else None)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        hits, misses = self._cache.stats()
+        return {
+            'hits': hits,
+            'misses': misses,
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+        }
+
+
+def create_cache(directory, maxsize, ttl, entry_bytes=16 * 1024):
+    """A DiskCache in `directory` when it is set and diskcache is installed, else an in-process PredictionCache."""
+    if directory:
+        try:
+            return DiskCache(directory, maxsize, ttl, entry_bytes)
+        except ImportError:
+            pass
+    return PredictionCache(maxsize, ttl)
@@ -0,0 +1,75 @@
+# chat_history.py - Bounded, server-side chat history per browser session
+#
+# The browser only holds a session id and the rendered bubbles; the turns
+# themselves live here, so chat requests no longer carry the conversation.
+
+from config import (
+    CHAT_HISTORY_DIR, CHAT_HISTORY_SESSIONS, CHAT_HISTORY_TTL,
+    CHAT_HISTORY_TURNS, CHAT_PROMPT_TURNS
+)
+from Utils.cache import create_cache
+
+# Longest stretch of one message quoted back into a prompt
+MAX_QUOTE_CHARS = 600
+
+# How many earlier questions the summary line lists
+MAX_SUMMARY_QUESTIONS = 10
+
+_store = None
+
+
+def get_history_store():
+    """Session id -> {'earlier': [questions], 'turns': [{'user', 'assistant'}]}."""
+    global _store
+    if _store is None:
+        _store = create_cache(CHAT_HISTORY_DIR, CHAT_HISTORY_SESSIONS, CHAT_HISTORY_TTL,
+                              entry_bytes=CHAT_HISTORY_TURNS * 2 * 1024)
+    return _store
+
+
+def load_session(session_id):
+    record = get_history_store().get(session_id) if session_id else None
+    return record or {'earlier': [], 'turns': []}
+
+
+def record_turn(session_id, question, reply):
+    """
+    Append one exchange. Past CHAT_HISTORY_TURNS the oldest exchanges are
+    dropped and only their questions are kept, for the summary.
+    """
+    record = load_session(session_id)
+    turns = record['turns'] + [{'user': question, 'assistant': reply}]
+    earlier = record['earlier']
+
+    overflow = len(turns) - CHAT_HISTORY_TURNS
+    if overflow > 0:
+        earlier = (earlier + [t['user'] for t in turns[:overflow]])[-MAX_SUMMARY_QUESTIONS:]
+        turns = turns[overflow:]
+
+    get_history_store().put(session_id, {'earlier': earlier, 'turns': turns})
+
+
+def _quote(text):
+    text = " ".join(str(text).split())
+    return text if len(text) <= MAX_QUOTE_CHARS else text[:MAX_QUOTE_CHARS] + "..."
+
+
+def prompt_history(session_id):
+    """
+    Conversation so far, as prompt text: a one-line summary of the earlier
+    questions, then the last CHAT_PROMPT_TURNS exchanges verbatim (each
+    message capped at MAX_QUOTE_CHARS). Empty for a new session.
+    """
+    record = load_session(session_id)
+    turns = record['turns']
+    recent = turns[-CHAT_PROMPT_TURNS:] if CHAT_PROMPT_TURNS > 0 else []
+    older = record['earlier'] + [t['user'] for t in turns[:len(turns) - len(recent)]]
+
+    lines = []
+    if older:
+        asked = "; ".join(_quote(q) for q in older[-MAX_SUMMARY_QUESTIONS:])
+        lines.append(f"Earlier in this conversation the user asked about: {asked}.")
+    for turn in recent:
+        lines.append(f"User: {_quote(turn['user'])}")
+        lines.append(f"Assistant: {_quote(turn['assistant'])}")
+    return "\n".join(lines)
@@ -1,32 +1,246 @@
-import google.generativeai as genai
+# chatbot_service.py - Chat assistant backends (Gemini or an offline fake)
+#
+# Each process keeps one backend client for its lifetime. Replies are cached
+# on (normalized question, relevant patient data); the suggestion chips plus
+# other common definitions share one cached reply per question (FAQ_QUESTIONS)
+# whatever the patient data or conversation.
+
+import hashlib
 import os
+import re
+import time
+
+from config import (
+    CHAT_BACKEND, CHAT_CACHE_DIR, CHAT_CACHE_SIZE, CHAT_CACHE_TTL,
+    CHAT_FAKE_TOKEN_DELAY, CHAT_MODEL, FEATURE_GROUPS
+)
+from Utils.cache import create_cache
+from Utils.labels import get_readable_data
+
+# System Prompt Engineering - static, so it is sent as the model's system
+# instruction once per client instead of being rebuilt into every prompt
+SYSTEM_CONTEXT = (
+    "You are a helpful medical assistant for an Alzheimer's risk assessment tool. "
+    "You provide clear, empathetic explanations of medical terms (like MMSE, BMI). "
+    "Do not provide diagnosis. If asked for medical advice, advise consulting a doctor. "
+)
+
+# Common definition questions (the suggestion chips among them), keyed by the
+# question put to the backend and listing every normalized phrasing of it.
+# The first ask fills the reply cache; after that every phrasing, in any
+# session and for any patient, is answered from that one entry.
+_FAQ = {
+    "what is ldl cholesterol": ("what is ldl", "what s ldl", "what is ldl cholesterol", "define ldl"),
+    "what is hdl cholesterol": ("what is hdl", "what s hdl", "what is hdl cholesterol", "define hdl"),
+    "what are triglycerides": ("what are triglycerides", "what is triglycerides", "what are triglyceride"),
+    "what are the risks of hypertension": ("risks of hypertension", "what are the risks of hypertension",
+                                           "what is hypertension"),
+    "what is the mmse": ("what is mmse", "what s mmse", "what is the mmse", "what is mmse score"),
+    "what is bmi": ("what is bmi", "what s bmi", "what is body mass index"),
+    "what is the adl score": ("what is adl", "what is adl score", "what are activities of daily living"),
+    "what is a functional assessment": ("what is functional assessment", "what is a functional assessment"),
+}
+FAQ_QUESTIONS = {phrasing: question for question, phrasings in _FAQ.items() for phrasing in phrasings}
+
+# Extra phrases that refer to a form field, beyond its name and label
+_FIELD_ALIASES = {
+    'CholesterolLDL': ('ldl',),
+    'CholesterolHDL': ('hdl',),
+    'CholesterolTriglycerides': ('triglyceride', 'triglycerides'),
+    'CholesterolTotal': ('cholesterol',),
+    'SystolicBP': ('blood pressure', 'bp', 'hypertension'),
+    'DiastolicBP': ('blood pressure', 'bp', 'hypertension'),
+    'AlcoholConsumption': ('alcohol', 'drinking'),
+    'PhysicalActivity': ('exercise', 'activity'),
+    'SleepQuality': ('sleep',),
+    'DietQuality': ('diet',),
+    'FamilyHistoryAlzheimers': ('family history',),
+}
+
+# Words that make a question about the patient's own data, so it gets the whole form
+_PERSONAL_WORDS = {'my', 'me', 'i', 'mine', 'analyze', 'analyse', 'analysis', 'results', 'data'}
+
 
-# Configure API Key (Best practice: use Environment Variables)
-# os.environ["GOOGLE_API_KEY"] = ""
-genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+def normalize_question(text):
+    """Lowercase words only, so "What is LDL?" and "what is ldl" share cache entries."""
+    return " ".join(re.findall(r"[a-z0-9]+", str(text).lower()))
 
 
-def get_chat_response(user_message, context_data=None):
+FIELD_ORDER = [f['name'] for group in FEATURE_GROUPS.values() for f in group['features']]
+FIELD_TERMS = {
+    f['name']: {normalize_question(f['name']), normalize_question(f['label']),
+                *_FIELD_ALIASES.get(f['name'], ())}
+    for group in FEATURE_GROUPS.values() for f in group['features']
+}
+
+
+def relevant_context(question, context_data):
     """
-    Sends message to Gemini and gets response.
-    context_data: Optional dictionary of current patient data to make answers relevant.
+    The patient data worth sending for a normalized question, as readable
+    "Name: value" text: the whole form for questions about the patient's own
+    data, otherwise only the fields the question mentions.
     """
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
+    if not context_data:
+        return ""
+
+    padded = f" {question} "
+    if _PERSONAL_WORDS & set(question.split()):
+        names = [name for name in FIELD_ORDER if name in context_data]
+    else:
+        names = [name for name in FIELD_ORDER
+                 if name in context_data and any(f" {term} " in padded for term in FIELD_TERMS[name])]
+
+    readable = get_readable_data({name: context_data[name] for name in names})
+    return ", ".join(f"{name}: {readable[name]}" for name in names)
+
+
+def build_prompt(user_message, context="", history=""):
+    """
+    The per-message part of the prompt: relevant patient data, the
+    conversation so far (see Utils.chat_history), then the question.
+    """
+    parts = []
+    if context:
+        parts.append(f"Current patient data context: {context}.")
+    if history:
+        parts.append(f"Conversation so far:\n{history}")
+    parts.append(f"User: {user_message}")
+    return "\n".join(parts)
+
+
+class GeminiBackend:
+    """Google Gemini through google-generativeai, streamed chunk by chunk."""
+
+    def __init__(self, model_name=CHAT_MODEL):
+        # Heavy import, only paid by processes that actually chat
+        import google.generativeai as genai
+
+        # Configure API Key (Best practice: use Environment Variables)
+        genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+        self.model = genai.GenerativeModel(model_name, system_instruction=SYSTEM_CONTEXT)
+
+    def stream(self, prompt):
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeBackend:
+    """
+    Offline stand-in that streams a canned reply word by word, sleeping
+    `delay` seconds per word, so the chat can be developed and load-tested
+    without network access or an API key. `calls` counts generated replies.
+    """
+
+    def __init__(self, delay=CHAT_FAKE_TOKEN_DELAY):
+        self.delay = delay
+        self.calls = 0
 
-        # System Prompt Engineering
-        system_context = (
-            "You are a helpful medical assistant for an Alzheimer's risk assessment tool. "
-            "You provide clear, empathetic explanations of medical terms (like MMSE, BMI). "
-            "Do not provide diagnosis. If asked for medical advice, advise consulting a doctor. "
-        )
+    def stream(self, prompt):
+        self.calls += 1
+        question = prompt.rsplit("User: ", 1)[-1].strip()
+        reply = (f"(offline assistant) You asked: \"{question}\". "
+                 "This is a placeholder answer from the fake chat backend. "
+                 "Please consult a doctor for medical advice.")
+        for i, word in enumerate(reply.split(" ")):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word if i == 0 else " " + word
 
-        if context_data:
-            system_context += f"Current patient data context: {str(context_data)}. "
 
-        full_prompt = f"{system_context}\nUser: {user_message}"
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
 
-        response = model.generate_content(full_prompt)
-        return response.text
+# One client per process, built on first use
+_backends = {}
+
+
+def get_backend(name=None):
+    """This process's chat backend named by `name` (default: config.CHAT_BACKEND)."""
+    name = name or CHAT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown chat backend {name!r}; expected one of {list(BACKENDS)}")
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _backends[name] = BACKENDS[name]()
+    return backend
+
+
+def _after_fork():
+    """
+    gRPC channels must not cross a fork, so forked children (gunicorn workers
+    with --preload, chat background jobs) build their own client on first use.
+    """
+    _backends.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class ChatBackendError(Exception):
+    """The backend failed mid-reply; str() is the message to show the user."""
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """The reply cache: on disk when CHAT_CACHE_DIR is set and diskcache is installed."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = create_cache(CHAT_CACHE_DIR, CHAT_CACHE_SIZE, CHAT_CACHE_TTL)
+    return _response_cache
+
+
+def stream_chat_response(user_message, context_data=None, backend=None, history=""):
+    """
+    Yield the assistant's reply in chunks as they arrive. Cached replies
+    come back as a single chunk without contacting the backend.
+    Raises ChatBackendError if the backend fails, after any chunks it sent.
+    context_data: Optional dictionary of current patient data to make answers relevant.
+    history: Optional conversation so far, from Utils.chat_history.prompt_history.
+    """
+    question = normalize_question(user_message)
+    faq = FAQ_QUESTIONS.get(question)
+    if faq is not None:
+        # A definition does not depend on the patient or the conversation
+        user_message, context, history = faq, "", ""
+        key = (faq, "", "")
+    else:
+        context = relevant_context(question, context_data)
+        # A follow-up can mean something else after a different conversation
+        key = (question, context, hashlib.sha1(history.encode()).hexdigest() if history else "")
+    cache = get_response_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    try:
+        backend = backend or get_backend()
+        for chunk in backend.stream(build_prompt(user_message, context, history)):
+            chunks.append(chunk)
+            yield chunk
     except Exception as e:
-        return f"Error connecting to AI Assistant: {str(e)}"
\ No newline at end of file
+        # Errors are shown but never cached, nor kept as the assistant's turn
+        raise ChatBackendError(f"Error connecting to AI Assistant: {str(e)}") from e
+    cache.put(key, "".join(chunks))
+
+
+def get_chat_response(user_message, context_data=None, backend=None, history=""):
+    """
+    Sends message to the chat backend and gets the full response.
+    context_data: Optional dictionary of current patient data to make answers relevant.
+    A backend failure comes back as the error text.
+    """
+    chunks = []
+    try:
+        for chunk in stream_chat_response(user_message, context_data, backend, history):
+            chunks.append(chunk)
+    except ChatBackendError as e:
+        chunks.append(str(e))
+    return "".join(chunks)
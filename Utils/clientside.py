@@ -0,0 +1,142 @@
+# clientside.py - Browser-side routing, navbar, form validation and report downloads
+#
+# Everything here runs in the browser, so navigation, the mobile menu and
+# range checks never reach the server; only scoring and the chat do.
+# The JavaScript is generated from config.FEATURE_GROUPS and Utils.pages.PAGES.
+
+import json
+
+from dash import Input, Output, State, ALL, MATCH
+
+from config import FEATURE_GROUPS
+from Utils.pages import PAGES
+
+# {feature name: [min, max]} for every ranged number field on the form
+FIELD_RANGES = {
+    f['name']: [f.get('min'), f.get('max')]
+    for group in FEATURE_GROUPS.values() for f in group['features']
+    if f['type'] == 'number' and ('min' in f or 'max' in f)
+}
+
+# Shared by the per-field message and the predict-button guard; the wording
+# follows Utils.validation so the browser and the API say the same thing
+_FIELD_ERROR_JS = """
+    function fieldError(value, range) {
+        if (!range) { return ''; }
+        if (value === null || value === undefined || value === '' || isNaN(Number(value))) {
+            return 'Required and must be numeric';
+        }
+        const low = range[0], high = range[1];
+        if ((low !== null && Number(value) < low) || (high !== null && Number(value) > high)) {
+            return 'Must be between ' + low + ' and ' + high;
+        }
+        return '';
+    }
+"""
+
+
+def _js(template, helpers='', **data):
+    """
+    Fill __HELPERS__ with JavaScript source and every other __NAME__ placeholder
+    with its value as JSON, leaving JavaScript braces alone.
+    """
+    template = template.replace('__HELPERS__', helpers)
+    for name, value in data.items():
+        template = template.replace(f'__{name.upper()}__', json.dumps(value))
+    return template
+
+
+def register_clientside_callbacks(app):
+    """Register the routing, navbar collapse and range validation callbacks."""
+
+    # --- Page Routing ---
+    # Each layout is fetched once per browser session from /_pages/<name>
+    # (ETag-revalidated by the browser's HTTP cache) and then kept in memory
+    app.clientside_callback(
+        _js("""
+        async function(pathname) {
+            const pages = __PAGES__;
+            const trimmed = (pathname || '/').replace(/^\\/+|\\/+$/g, '');
+            const name = pages.includes(trimmed) ? trimmed : 'home';
+
+            const cache = window.neuroPages = window.neuroPages || {};
+            if (!cache[name]) {
+                cache[name] = fetch(__PREFIX__ + '_pages/' + name).then(function(response) {
+                    if (!response.ok) {
+                        throw new Error('Could not load page ' + name + ': HTTP ' + response.status);
+                    }
+                    return response.json();
+                });
+            }
+            try {
+                return await cache[name];
+            } catch (err) {
+                delete cache[name];
+                throw err;
+            }
+        }
+        """, pages=list(PAGES), prefix=app.config.requests_pathname_prefix),
+        Output("page-content", "children"),
+        Input("url", "pathname")
+    )
+
+    # --- Navbar Toggle for Mobile ---
+    app.clientside_callback(
+        """
+        function(n_clicks, is_open) {
+            return n_clicks ? !is_open : is_open;
+        }
+        """,
+        Output("navbar-collapse", "is_open"),
+        Input("navbar-toggler", "n_clicks"),
+        State("navbar-collapse", "is_open"),
+    )
+
+    # --- Per-field Range Validation ---
+    app.clientside_callback(
+        _js("""
+        function(value, id) {
+            __HELPERS__
+            return fieldError(value, __RANGES__[id.index]);
+        }
+        """, helpers=_FIELD_ERROR_JS, ranges=FIELD_RANGES),
+        Output({'type': 'field-error', 'index': MATCH}, 'children'),
+        Input({'type': 'input-field', 'index': MATCH}, 'value'),
+        State({'type': 'input-field', 'index': MATCH}, 'id'),
+    )
+
+    # --- Only let valid forms reach the scoring callback ---
+    app.clientside_callback(
+        _js("""
+        function(values, ids) {
+            __HELPERS__
+            const ranges = __RANGES__;
+            return ids.some(function(id, i) { return fieldError(values[i], ranges[id.index]) !== ''; });
+        }
+        """, helpers=_FIELD_ERROR_JS, ranges=FIELD_RANGES),
+        Output("predict-btn", "disabled"),
+        Input({'type': 'input-field', 'index': ALL}, 'value'),
+        State({'type': 'input-field', 'index': ALL}, 'id'),
+    )
+
+    # --- Report download: fetch the PDF that download_report points at ---
+    app.clientside_callback(
+        """
+        function(report) {
+            if (report && report.url) {
+                // A download link, so an expired report fails the download
+                // instead of navigating away from the form
+                const link = document.createElement('a');
+                link.href = report.url;
+                link.download = '';
+                document.body.appendChild(link);
+                link.click();
+                link.remove();
+            }
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output("btn-download-pdf", "data-download"),
+        Input("report-download", "data"),
+        prevent_initial_call=True
+    )
@@ -0,0 +1,248 @@
+# compiled_model.py - sklearn-free scoring kernel for linear models
+#
+# Export once from the pickled pipeline:
+#   python -m Utils.compiled_model models/alzheimer_lr_model.pkl models/alzheimer_lr_model.npz
+# or, for a memory-mapped directory that forked workers share page-for-page:
+#   python -m Utils.compiled_model models/alzheimer_lr_model.pkl models/alzheimer_lr_model
+
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+
+class LabelLookup:
+    """
+    A fitted LabelEncoder compiled to plain lookup tables: a dict for single
+    values and the sorted classes_ for np.searchsorted over whole columns.
+    Encodes exactly like LabelEncoder.transform given the same str values.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self.index = {label: code for code, label in enumerate(self.classes_.tolist())}
+
+    @classmethod
+    def from_encoder(cls, encoder):
+        """Compile anything with a sorted classes_ (a LabelEncoder); LabelLookups pass through."""
+        return encoder if isinstance(encoder, cls) else cls(encoder.classes_)
+
+    def unknown(self, labels):
+        """ValueError naming the unseen labels and the known ones."""
+        known = ", ".join(repr(label) for label in self.index)
+        unseen = ", ".join(repr(label) for label in labels)
+        noun = "category" if len(labels) == 1 else "categories"
+        return ValueError(f"unknown {noun} {unseen} (expected one of: {known})")
+
+    def encode(self, value):
+        """Code of one form value, looked up as str(value) like the encoder saw at fit time."""
+        code = self.index.get(str(value))
+        if code is None:
+            raise self.unknown([str(value)])
+        return code
+
+    def encode_column(self, column):
+        """
+        Codes for a whole column of raw form values, equal to
+        transform(np.asarray(column).astype(str)) but looking up each
+        distinct value once instead of converting every row to str.
+        """
+        values = np.asarray(column)
+        try:
+            uniques, inverse = np.unique(values, return_inverse=True)
+        except TypeError:
+            # Values that cannot be sorted together (e.g. None next to numbers)
+            return self.transform(values.astype(str))
+        labels = [str(value) for value in uniques.tolist()]
+        codes = [self.index.get(label) for label in labels]
+        if None in codes:
+            raise self.unknown([label for label, code in zip(labels, codes) if code is None])
+        return np.array(codes, dtype=np.intp)[inverse.reshape(-1)]
+
+    def transform(self, y):
+        y = np.asarray(y)
+        if not len(self.classes_):
+            if len(y):
+                raise self.unknown(np.unique(y).tolist())
+            return np.zeros(0, dtype=np.intp)
+        idx = np.searchsorted(self.classes_, y)
+        idx_clipped = np.minimum(idx, len(self.classes_) - 1)
+        unseen = self.classes_[idx_clipped] != y
+        if unseen.any():
+            raise self.unknown(np.unique(y[unseen]).tolist())
+        return idx
+
+
+class CompiledLinearModel:
+    """
+    Binary logistic regression flattened to one weight vector and bias,
+    with any standardization folded into the weights.
+    """
+
+    def __init__(self, weights, bias, classes, feature_names, encoders=None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.encoders = dict(encoders or {})
+
+    @classmethod
+    def from_estimator(cls, model, feature_names=None, encoders=None):
+        """Flatten a fitted [StandardScaler ->] LogisticRegression pipeline."""
+        params = extract_linear(model)
+        if params is None:
+            raise ValueError(f"Cannot compile {type(model).__name__}: not a binary logistic regression")
+
+        mean, scale, coef, intercept, classes = params
+        weights = coef / scale
+        bias = intercept - float(np.dot(mean, weights))
+
+        if feature_names is None:
+            feature_names = getattr(model, 'feature_names_in_', [])
+        encoders = {name: enc.classes_ for name, enc in (encoders or {}).items()}
+        return cls(weights, bias, classes, feature_names, encoders)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Load an exported model without touching sklearn or pickle.
+        Directories are memory-mapped (read-only, shared between processes);
+        .npz archives are read into private memory.
+        """
+        if os.path.isdir(path):
+            return cls._load_dir(path, mmap_mode)
+
+        with np.load(path, allow_pickle=False) as data:
+            encoders = {
+                key[len('encoder__'):]: data[key]
+                for key in data.files if key.startswith('encoder__')
+            }
+            return cls(data['weights'], data['bias'], data['classes'],
+                       data['features'].tolist(), encoders)
+
+    @classmethod
+    def _load_dir(cls, path, mmap_mode):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+
+        encoders = {name: array(f'encoder__{name}') for name in meta['encoders']}
+        return cls(array('weights'), meta['bias'], array('classes'), meta['features'], encoders)
+
+    def save(self, path):
+        """
+        Write the weights, classes, feature order and encoder classes, either
+        as one .npz archive or as a directory of .npy files plus meta.json.
+        """
+        arrays = {
+            'weights': self.weights,
+            'classes': self.classes_,
+            **{f'encoder__{name}': np.asarray(classes) for name, classes in self.encoders.items()}
+        }
+
+        if str(path).endswith('.npz'):
+            np.savez(path, bias=np.float64(self.bias),
+                     features=np.asarray(self.feature_names, dtype=str), **arrays)
+            return
+
+        os.makedirs(path, exist_ok=True)
+        for name, arr in arrays.items():
+            np.save(os.path.join(path, f'{name}.npy'), arr, allow_pickle=False)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({
+                'bias': self.bias,
+                'features': self.feature_names,
+                'encoders': list(self.encoders),
+            }, f, indent=2)
+
+    def label_encoders(self):
+        """Encoder classes wrapped as LabelLookup objects."""
+        return {name: LabelLookup(classes) for name, classes in self.encoders.items()}
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.bias
+
+    def predict_proba(self, X):
+        z = self.decision_function(X)
+        positive = _expit(z)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    def score_row(self, row):
+        """Return (prediction, probability) for a single feature-ordered row."""
+        z = float(np.dot(row, self.weights)) + self.bias
+        prediction = self.classes_[1] if z > 0 else self.classes_[0]
+        return prediction, sigmoid(z)
+
+
+def extract_linear(model):
+    """
+    Return (mean, scale, coef, intercept, classes) when the model is a binary
+    logistic regression, optionally behind a StandardScaler; otherwise None.
+    """
+    steps = list(getattr(model, 'steps', [(None, model)]))
+    final = steps[-1][1]
+    if type(final).__name__ != 'LogisticRegression' or len(final.classes_) != 2:
+        return None
+
+    n_features = final.coef_.shape[1]
+    mean, scale = np.zeros(n_features), np.ones(n_features)
+    scalers = 0
+    for _, step in steps[:-1]:
+        if step is None or step == 'passthrough' or hasattr(step, 'fit_resample'):
+            # Samplers such as SMOTE only act at fit time
+            continue
+        if type(step).__name__ != 'StandardScaler' or scalers:
+            return None
+        scalers += 1
+        if step.with_mean:
+            mean = np.asarray(step.mean_, dtype=np.float64)
+        if step.with_std:
+            scale = np.asarray(step.scale_, dtype=np.float64)
+
+    return mean, scale, final.coef_[0].astype(np.float64), float(final.intercept_[0]), final.classes_
+
+
+def sigmoid(z):
+    """Numerically stable logistic function for a scalar."""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def _expit(z):
+    """Vectorized logistic function that does not overflow for large |z|."""
+    out = np.empty_like(z)
+    pos = z >= 0
+    out[pos] = 1.0 / (1.0 + np.exp(-z[pos]))
+    e = np.exp(z[~pos])
+    out[~pos] = e / (1.0 + e)
+    return out
+
+
+def export(model_file, out_file):
+    """Compile a pickled model (bare estimator or metadata bundle) to .npz or a directory."""
+    import joblib
+
+    data = joblib.load(model_file)
+    if isinstance(data, dict):
+        compiled = CompiledLinearModel.from_estimator(
+            data['model'], data.get('features') or None, data.get('encoders'))
+    else:
+        compiled = CompiledLinearModel.from_estimator(data)
+    compiled.save(out_file)
+    return compiled
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m Utils.compiled_model MODEL.pkl OUT.npz|OUT_DIR")
+    compiled = export(sys.argv[1], sys.argv[2])
+    print(f"✓ Compiled {len(compiled.feature_names)} features to {sys.argv[2]}")
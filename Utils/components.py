@@ -13,6 +13,7 @@ def create_input_field(feature):
         html.Span(feature['label']),
         html.Span(f" ({unit})", className="input-unit") if unit else None
     ], className="input-label")
+    error = None
 
     if feature['type'] == 'number':
         input_comp = dbc.Input(
@@ -21,6 +22,8 @@ def create_input_field(feature):
             min=feature.get('min'), max=feature.get('max'),
             step="any", className="form-control"
         )
+        # Filled in the browser by the clientside range check
+        error = html.Div(id={'type': 'field-error', 'index': feature['name']}, className="field-error")
     elif feature['type'] == 'dropdown':
         input_comp = dbc.Select(
             id=id_name, options=feature['options'],
@@ -37,7 +40,7 @@ def create_input_field(feature):
         input_comp = dbc.Input(id=id_name, className="form-control")
 
     return dbc.Col([
-        html.Div([label, input_comp], className="input-group-custom")
+        html.Div([label, input_comp, error], className="input-group-custom")
     ], xs=12, sm=6, lg=4)
 
 
@@ -132,7 +135,8 @@ def create_result_card(result):
             html.I(className="fa-solid fa-file-pdf me-2"),
             "Download PDF Report"
         ], id="btn-download-pdf", className="btn btn-outline-primary mt-2"),
-        dcc.Download(id="download-pdf-component")
+        # Where the rendered report can be fetched; Utils/clientside.py follows it
+        dcc.Store(id="report-download")
     ])
 
 
@@ -205,6 +209,31 @@ def create_error_alert(message, color="danger"):
     ], color=color, style={"borderRadius": "12px"})
 
 
+def create_user_bubble(text):
+    """Chat message from the user (aligned right)."""
+    return html.Div([
+        html.Div(text, style={
+            "backgroundColor": "#e0e7ff", "color": "#333",
+            "padding": "10px 15px", "borderRadius": "15px 15px 0 15px",
+            "maxWidth": "85%", "alignSelf": "flex-end", "display": "inline-block"
+        })
+    ], style={"textAlign": "right", "width": "100%"})
+
+
+def create_ai_bubble(text):
+    """Chat message from the assistant (aligned left)."""
+    return html.Div([
+        html.Div([
+            html.I(className="fa-solid fa-robot me-2", style={"color": "var(--primary)"}),
+            html.Span(text)
+        ], style={
+            "backgroundColor": "#f3f4f6", "color": "#1f2937",
+            "padding": "10px 15px", "borderRadius": "15px 15px 15px 0",
+            "maxWidth": "90%", "display": "inline-block"
+        })
+    ], style={"textAlign": "left", "width": "100%"})
+
+
 def get_all_feature_cards():
     """Generate all feature cards."""
     return [
@@ -215,6 +244,9 @@ def get_all_feature_cards():
 
 def create_chat_component():
     return html.Div([
+        # Server-side chat history key, one per page load (set by the first reply)
+        dcc.Store(id="chat-session", storage_type="memory"),
+
         # 1. Floating Button (Wrapped in a Div we can hide/show)
         html.Div(
             dbc.Button(
@@ -344,24 +376,27 @@ def create_chat_component():
                         "margin": "15px"
                     }),
 
-                    # Chat History with Loading Spinner
-                    dcc.Loading(
-                        id="loading-chat",
-                        type="dot",
-                        color="var(--primary)",
-                        children=html.Div(
-                            id="chat-history",
-                            style={
-                                "flexGrow": 1,
-                                "overflowY": "auto",
-                                "padding": "15px",
-                                "display": "flex",
-                                "flexDirection": "column",
-                                "gap": "12px",
-                                "minHeight": "300px"
-                            }
-                        )
-                    ),
+                    # Chat History, followed by the reply currently streaming in
+                    html.Div([
+                        html.Div(id="chat-history", children=[], style={
+                            "display": "flex",
+                            "flexDirection": "column",
+                            "gap": "12px"
+                        }),
+                        html.Div(id="chat-stream", style={
+                            "display": "flex",
+                            "flexDirection": "column",
+                            "gap": "12px"
+                        })
+                    ], id="chat-scroll", style={
+                        "flexGrow": 1,
+                        "overflowY": "auto",
+                        "padding": "15px",
+                        "display": "flex",
+                        "flexDirection": "column",
+                        "gap": "12px",
+                        "minHeight": "300px"
+                    }),
                 ], style={
                     "flexGrow": 1,
                     "overflowY": "auto",
@@ -0,0 +1,100 @@
+# labels.py - Encoded option values back to the labels shown in the form
+
+from types import MappingProxyType
+
+import numpy as np
+
+from config import FEATURE_GROUPS
+
+# Built once at import from config.py, read-only afterwards:
+# {'Gender': {0: 'Male', 1: 'Female'}, 'Smoking': {0: 'No', 1: 'Yes'}, ...}
+OPTION_LABELS = MappingProxyType({
+    feature['name']: MappingProxyType({opt['value']: opt['label'] for opt in feature['options']})
+    for group in FEATURE_GROUPS.values()
+    for feature in group['features']
+    if 'options' in feature
+})
+
+# Same index as sorted (values, labels) arrays for the vectorized decoder
+_OPTION_TABLES = {
+    name: (np.array(sorted(mapping), dtype=np.float64),
+           np.array([mapping[v] for v in sorted(mapping)], dtype=object))
+    for name, mapping in OPTION_LABELS.items()
+}
+
+
+def _label(mapping, val):
+    """
+    Label for one value, by the same rule as decode_columns: a value whose
+    number is exactly an option value ("1", 1 and 1.0 alike) gets its label,
+    anything else (1.7, "abc") is kept as-is.
+    """
+    try:
+        return mapping[val]
+    except (KeyError, TypeError):
+        pass
+    # Equal floats and ints hash alike, so 1.0 finds the option stored as 1
+    return mapping.get(_as_float(val), val)
+
+
+def get_readable_data(input_data):
+    """
+    Converts model-friendly numeric data (0, 1) back to human-readable strings (Male, Female)
+    based on the 'options' defined in config.py.
+    """
+    readable_data = input_data.copy()
+    for key, val in input_data.items():
+        mapping = OPTION_LABELS.get(key)
+        if mapping is not None:
+            readable_data[key] = _label(mapping, val)
+    return readable_data
+
+
+def decode_columns(columns):
+    """
+    Vectorized get_readable_data for whole batches. `columns` is a DataFrame or
+    a dict of equal-length arrays; option columns come back as label arrays in a
+    new object of the same kind. Values that are not an exact option value are kept.
+    """
+    decoded = columns.copy()
+    for name, (values, labels) in _OPTION_TABLES.items():
+        if name not in decoded:
+            continue
+
+        raw = np.asarray(decoded[name])
+        try:
+            col = raw.astype(np.float64)
+        except (TypeError, ValueError):
+            col = np.array([_as_float(v) for v in raw])
+
+        idx = np.minimum(np.searchsorted(values, col), len(values) - 1)
+        matched = values[idx] == col
+        out = raw.astype(object)
+        out[matched] = labels[idx[matched]]
+        decoded[name] = out
+    return decoded
+
+
+def decode_records(records):
+    """
+    decode_columns for a list of record dicts; returns new dicts in the same
+    order. Records may have different keys: a field is decoded in every record
+    that has it and not added to the others.
+    """
+    present = set().union(*records) if records else set()
+    names = [name for name in _OPTION_TABLES if name in present]
+    columns = decode_columns({name: [r.get(name) for r in records] for name in names})
+
+    decoded = [dict(r) for r in records]
+    for name in names:
+        for record, label in zip(decoded, columns[name]):
+            if name in record:
+                record[name] = label
+    return decoded
+
+
+def _as_float(val):
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
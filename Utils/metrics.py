@@ -0,0 +1,275 @@
+# metrics.py - In-process timings, payload sizes and error counts, exposed in Prometheus text format at GET /metrics
+#
+# Recorded:
+#   neuropredict_callback_seconds{callback}       Dash callbacks run in the request
+#   neuropredict_callback_errors_total{callback}  exceptions they raised (PreventUpdate aside)
+#   neuropredict_http_request_seconds{route}      every Flask request, by route rule; Dash
+#   neuropredict_http_request_bytes{route}        updates are labelled "dash:<callback>"
+#   neuropredict_http_response_bytes{route}
+#   neuropredict_http_errors_total{route}         responses with status >= 500
+#   neuropredict_model_seconds{operation}         LoadedModel.from_file ("load", which is how
+#                                                 ModelHandler and the registry load), predict
+#                                                 and predict_batch
+#   neuropredict_model_batch_rows                 rows per predict_batch
+#   neuropredict_model_errors_total{operation}
+#
+# Metrics live in the process that records them: with several web workers
+# each one reports its own, and background jobs (which run in their own
+# processes) show up only through the requests that start and poll them.
+# Set METRICS_ENABLED=0 to leave every function unwrapped.
+
+import threading
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+
+from config import METRICS_ENABLED
+
+# Seconds: from a cached lookup to a slow LLM or report job
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(9))  # 256 B .. 16 MB
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per label value (one label at most)."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label=None):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label=None, amount=1):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: str(item[0]))
+        for label, value in values:
+            pairs = [(self.label, label)] if self.label else []
+            yield f"{self.name}{_labels(pairs)} {_number(value)}"
+
+
+class Histogram:
+    """Bucketed observations per label value, rendered with cumulative buckets like prometheus_client."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets, label=None):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.bounds = tuple(buckets)
+        # label -> [count per bucket..., count above the last bound, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, label=None):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [0] * (len(self.bounds) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def lines(self):
+        with self._lock:
+            snapshot = sorted(((label, list(series)) for label, series in self._series.items()),
+                              key=lambda item: str(item[0]))
+        for label, series in snapshot:
+            pairs = [(self.label, label)] if self.label else []
+            total = 0
+            for bound, count in zip(self.bounds + ('+Inf',), series[:-1]):
+                total += count
+                le = bound if bound == '+Inf' else _number(float(bound))
+                yield f"{self.name}_bucket{_labels(pairs + [('le', le)])} {total}"
+            yield f"{self.name}_sum{_labels(pairs)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(pairs)} {total}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        out = []
+        for metric in self.metrics:
+            out.append(f"# HELP {metric.name} {metric.documentation}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        return '\n'.join(out) + '\n'
+
+
+registry = Registry()
+
+callback_seconds = registry.register(Histogram(
+    'neuropredict_callback_seconds', "Dash callback run time.", LATENCY_BUCKETS, 'callback'))
+callback_errors = registry.register(Counter(
+    'neuropredict_callback_errors_total', "Exceptions raised by Dash callbacks.", 'callback'))
+http_seconds = registry.register(Histogram(
+    'neuropredict_http_request_seconds', "Flask request handling time.", LATENCY_BUCKETS, 'route'))
+http_request_bytes = registry.register(Histogram(
+    'neuropredict_http_request_bytes', "Request body size.", SIZE_BUCKETS, 'route'))
+http_response_bytes = registry.register(Histogram(
+    'neuropredict_http_response_bytes', "Response body size (streamed responses excluded).",
+    SIZE_BUCKETS, 'route'))
+http_errors = registry.register(Counter(
+    'neuropredict_http_errors_total', "Responses with a 5xx status.", 'route'))
+model_seconds = registry.register(Histogram(
+    'neuropredict_model_seconds', "Model file loads and inference, including input checks.",
+    LATENCY_BUCKETS, 'operation'))
+model_batch_rows = registry.register(Histogram(
+    'neuropredict_model_batch_rows', "Patients per predict_batch call.", ROW_BUCKETS))
+model_errors = registry.register(Counter(
+    'neuropredict_model_errors_total', "Exceptions raised by model loading or inference.", 'operation'))
+
+# Name of the Dash callback running on this thread, for labelling its HTTP request
+_current = threading.local()
+
+
+def timed(histogram, label=None, errors=None, ignore=()):
+    """
+    Decorator: observe each call's duration in `histogram` under `label` and
+    count exceptions (other than `ignore`) in `errors`. A no-op when metrics
+    are disabled.
+    """
+
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except ignore:
+                raise
+            except Exception:
+                if errors is not None:
+                    errors.inc(label)
+                raise
+            finally:
+                histogram.observe(perf_counter() - start, label)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_callback(fn):
+    """Decorator for Dash callbacks (below @app.callback): timings and errors under the function's name."""
+    if not METRICS_ENABLED:
+        return fn
+    from dash.exceptions import PreventUpdate
+
+    name = fn.__name__
+    timed_fn = timed(callback_seconds, name, callback_errors, ignore=PreventUpdate)(fn)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        _current.callback = name
+        return timed_fn(*args, **kwargs)
+
+    return wrapper
+
+
+_REQUEST_KEY = 'neuropredict.request'
+
+
+def _recording_request_class(base):
+    """A Flask request class that leaves itself in the environ, where the matched url_rule outlives the request context."""
+
+    class RecordingRequest(base):
+        def __init__(self, environ, *args, **kwargs):
+            super().__init__(environ, *args, **kwargs)
+            environ[_REQUEST_KEY] = self
+
+    return RecordingRequest
+
+
+class _RequestMetrics:
+    """
+    WSGI middleware timing each request. It reads the WSGI environ and the
+    request object Flask built (left there by _recording_request_class)
+    instead of going through flask.request, whose context-local lookups
+    cost microseconds each.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        start = perf_counter()
+        _current.callback = None
+        sent = []
+
+        def recording_start_response(status, headers, exc_info=None):
+            sent.append(status)
+            sent.append(next((value for name, value in headers if name == 'Content-Length'), None))
+            return start_response(status, headers, exc_info)
+
+        result = self.app(environ, recording_start_response)
+
+        # Drop the reference right away: Flask breaks the environ <-> request cycle too
+        flask_request = environ.pop(_REQUEST_KEY, None)
+        callback = _current.callback
+        if callback:
+            route = f"dash:{callback}"
+        else:
+            rule = getattr(flask_request, 'url_rule', None)
+            route = rule.rule if rule is not None else 'unmatched'
+        http_seconds.observe(perf_counter() - start, route)
+        http_request_bytes.observe(int(environ.get('CONTENT_LENGTH') or 0), route)
+        if sent:
+            status, length = sent
+            # No Content-Length: a streamed response, whose size is unknown here
+            if length is not None:
+                http_response_bytes.observe(int(length), route)
+            if status[0] == '5':
+                http_errors.inc(route)
+        return result
+
+
+def register_metrics(server):
+    """
+    Time every request on `server` and serve GET /metrics. Dash update
+    requests are labelled with the callback that ran, other requests with
+    their route rule.
+    """
+    if not METRICS_ENABLED:
+        return
+    from flask import Response
+
+    server.request_class = _recording_request_class(server.request_class)
+    server.wsgi_app = _RequestMetrics(server.wsgi_app)
+
+    @server.route('/metrics')
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -1,70 +1,392 @@
 # model_handler.py - Model loading and prediction logic
 
-import joblib
-import pandas as pd
-from config import MODEL_FILE
+import math
+import os
+import threading
+import warnings
 
+import numpy as np
+from config import MODEL_FILE, MODEL_LOAD_MODE, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from Utils import metrics
+from Utils.compiled_model import CompiledLinearModel, LabelLookup, extract_linear
+from Utils.prediction_cache import PredictionCache
+from Utils.transform_graph import TransformGraph
 
-class ModelHandler:
-    def __init__(self):
-        self.model = None
-        self.feature_names = []
-        self.encoders = {}
-        self._load_model()
 
-    def _load_model(self):
-        """Load the trained model and associated data."""
-        try:
-            data = joblib.load(MODEL_FILE)
-            self.model = data['model']
-            self.feature_names = data.get('features', [])
-            self.encoders = data.get('encoders', {})
-            print("✓ Model loaded successfully.")
-        except FileNotFoundError:
-            print(f"✗ Model file '{MODEL_FILE}' not found.")
-        except Exception as e:
-            print(f"✗ Error loading model: {e}")
+class LoadedModel:
+    """
+    One model version with everything needed to score it. Treated as immutable
+    once built, so a request that grabbed it keeps a consistent view even if
+    the handler swaps in a newer version meanwhile.
+    """
 
-    def is_loaded(self):
-        """Check if model is loaded."""
-        return self.model is not None
+    def __init__(self, model, feature_names, encoders, version, graph=None):
+        self.model = model
+        self.feature_names = list(feature_names)
+        # sklearn LabelEncoders compiled to lookup tables once, at load time
+        self.encoders = {name: LabelLookup.from_encoder(enc) for name, enc in encoders.items()}
+        self.version = version
+        self._local = threading.local()
+
+        # Precompute the feature-order index and, for linear pipelines, the folded weights
+        self.feature_index = {name: j for j, name in enumerate(self.feature_names)}
+        if isinstance(model, CompiledLinearModel):
+            self.compiled = model
+        elif extract_linear(model) is not None:
+            self.compiled = CompiledLinearModel.from_estimator(model, self.feature_names)
+        else:
+            self.compiled = None
+        # Everything else scores through the scaler-folded graph (stored by training, or rebuilt here)
+        if graph is not None:
+            self.graph = TransformGraph.from_dict(graph)
+        else:
+            self.graph = TransformGraph.from_model(model, self.feature_names)
+
+    @classmethod
+    @metrics.timed(metrics.model_seconds, 'load', metrics.model_errors)
+    def from_file(cls, path, version=None):
+        """
+        Load a compiled model (.npz or memory-mapped directory, no sklearn import)
+        or a joblib pickle holding either a metadata bundle or a bare estimator.
+        """
+        if version is None:
+            version = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+
+        if os.path.isdir(path) or str(path).endswith('.npz'):
+            compiled = CompiledLinearModel.load(path)
+            return cls(compiled, compiled.feature_names, compiled.label_encoders(), version)
+
+        import joblib
+
+        data = joblib.load(path)
+        if isinstance(data, dict):
+            return cls(data['model'], data.get('features', []), data.get('encoders', {}), version,
+                       data.get('graph'))
+        # Bare estimator/pipeline saved without the metadata bundle
+        return cls(data, getattr(data, 'feature_names_in_', []), {}, version)
+
+    def _row_buffer(self):
+        """Per-thread preallocated float64 row, reset to the reindex fill value."""
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros(len(self.feature_names), dtype=np.float64)
+        else:
+            row.fill(0.0)
+        return row
 
     def prepare_input(self, values, ids):
         """Prepare input data from form values."""
-        input_data = {}
+        return self.encode_record({id_obj['index']: val for val, id_obj in zip(values, ids)})
 
-        for val, id_obj in zip(values, ids):
-            feature_name = id_obj['index']
+    def encode_record(self, record):
+        """One patient dict keyed by feature name with the label encoders applied, as prepare_batch does per column."""
+        input_data = {}
+        encoders = self.encoders
 
-            if feature_name in self.encoders:
+        for feature_name, val in record.items():
+            encoder = encoders.get(feature_name)
+            if encoder is not None:
                 try:
-                    val_str = str(val)
-                    encoded_val = self.encoders[feature_name].transform([val_str])[0]
-                    input_data[feature_name] = encoded_val
-                except Exception as e:
+                    input_data[feature_name] = encoder.encode(val)
+                except ValueError as e:
                     raise ValueError(f"Error encoding {feature_name}: {e}")
             else:
                 input_data[feature_name] = val
 
         return input_data
 
-    def predict(self, input_data):
-        """Make prediction and return models_results_plots."""
-        if not self.is_loaded():
-            raise RuntimeError("Model not loaded")
+    def prepare_batch(self, records):
+        """
+        Validate and encode many patients into a float64 matrix, one column at a time.
+        records: list of dicts keyed by feature name (raw form values, missing
+        features default to 0) or a 2-D array whose columns follow feature_names.
+        """
+        n_features = len(self.feature_names)
 
-        df = pd.DataFrame([input_data])
-        df = df.reindex(columns=self.feature_names, fill_value=0)
+        if isinstance(records, np.ndarray) or (len(records) and not isinstance(records[0], dict)):
+            arr = np.asarray(records)
+            if arr.ndim != 2 or arr.shape[1] != n_features:
+                raise ValueError(
+                    f"Expected a 2-D array with {n_features} columns, got shape {arr.shape}"
+                )
+            if not self.encoders and arr.dtype.kind in 'biuf':
+                X = np.array(arr, dtype=np.float64)
+                self._check_finite(X)
+                return X
+            columns = (arr[:, j] for j in range(n_features))
+        else:
+            columns = ([r.get(name, 0) for r in records] for name in self.feature_names)
 
-        prediction = self.model.predict(df)[0]
-        probability = self.model.predict_proba(df)[0][1]
+        X = np.empty((len(records), n_features), dtype=np.float64)
+        for j, (name, column) in enumerate(zip(self.feature_names, columns)):
+            try:
+                if name in self.encoders:
+                    X[:, j] = self.encoders[name].encode_column(column)
+                else:
+                    X[:, j] = np.asarray(column, dtype=np.float64)
+            except Exception as e:
+                raise ValueError(f"Error encoding {name}: {e}")
 
-        return {
+        self._check_finite(X)
+        return X
+
+    def _check_finite(self, X):
+        """Reject missing or infinite values, naming the offending features."""
+        bad = ~np.isfinite(X).all(axis=0)
+        if bad.any():
+            names = [self.feature_names[j] for j in np.flatnonzero(bad)]
+            raise ValueError(f"Missing or invalid values for: {', '.join(names)}")
+
+    def predict_proba(self, X):
+        """Run the model on a feature-ordered ndarray."""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)
+        with warnings.catch_warnings():
+            # Estimators fitted on DataFrames warn when scored with bare arrays
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return self.graph.predict_proba(X)
+
+    @metrics.timed(metrics.model_seconds, 'predict', metrics.model_errors)
+    def predict(self, input_data, cache=None):
+        """
+        Score one encoded patient dict. With a cache, results are keyed on the
+        canonical feature-ordered float64 vector plus this version.
+        """
+        # Same semantics as reindexing a one-row DataFrame: unknown keys are
+        # ignored and missing features default to 0
+        row = self._row_buffer()
+        index = self.feature_index
+        for name, val in input_data.items():
+            j = index.get(name)
+            if j is not None:
+                try:
+                    row[j] = float(val)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid value for {name}: {val!r}")
+
+        if cache is not None:
+            # Adding 0.0 folds -0.0 into 0.0 so both hash alike
+            row += 0.0
+            key = (self.version, row.tobytes())
+            cached = cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        if self.compiled is not None:
+            prediction, probability = self.compiled.score_row(row)
+            if not math.isfinite(probability):
+                self._check_finite(row[None, :])
+        else:
+            self._check_finite(row[None, :])
+            proba = self.predict_proba(row[None, :])[0]
+            probability = proba[1]
+            prediction = self.model.classes_[proba.argmax()]
+
+        result = {
             'prediction': int(prediction),
             'probability': float(probability),
-            'is_positive': prediction == 1
+            'is_positive': bool(prediction == 1),
+            'version': self.version
+        }
+        if cache is not None:
+            cache.put(key, result)
+            result = dict(result)
+        return result
+
+    @metrics.timed(metrics.model_seconds, 'predict_batch', metrics.model_errors)
+    def predict_batch(self, records):
+        """Score many patients with a single predict_proba pass."""
+        X = self.prepare_batch(records)
+        metrics.model_batch_rows.observe(len(X))
+        if self.compiled is None and len(X) > 1:
+            # Non-linear estimators are expensive per row: score duplicate profiles once
+            unique, inverse = np.unique(X, axis=0, return_inverse=True)
+            proba = self.predict_proba(unique)[inverse.ravel()]
+        else:
+            proba = self.predict_proba(X)
+        predictions = self.model.classes_[proba.argmax(axis=1)].astype(int)
+
+        return {
+            'prediction': predictions,
+            'probability': proba[:, 1],
+            'is_positive': predictions == 1,
+            'version': self.version
         }
 
 
+class ModelHandler:
+    LOAD_MODES = ('eager', 'lazy', 'background')
+
+    def __init__(self, model_file=MODEL_FILE, load_mode='eager'):
+        if load_mode not in self.LOAD_MODES:
+            raise ValueError(f"load_mode must be one of {self.LOAD_MODES}, got {load_mode!r}")
+
+        self.model_file = model_file
+        self.load_mode = load_mode
+        self._active = None
+        self.cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+        # 'not_loaded' -> 'loading' -> 'ready' | 'failed'
+        self.status = 'not_loaded'
+        self.load_error = None
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._done = threading.Event()
+        # The process whose loader state this is; see after_fork
+        self._pid = os.getpid()
+
+    def start(self):
+        """
+        Begin loading as load_mode says: now ('eager'), on a daemon thread
+        ('background') or not at all ('lazy', first use loads). Called by the
+        app; every other importer (CLIs, scoring pools, benchmarks) leaves it
+        alone and loads on first use, so importing this module starts no thread.
+        """
+        if self.load_mode == 'eager':
+            self._load_once()
+        elif self.load_mode == 'background':
+            self.start_background_load()
+
+    # The active version's attributes, for callers that only need a quick look
+    @property
+    def model(self):
+        return self._active.model if self._active else None
+
+    @property
+    def feature_names(self):
+        return self._active.feature_names if self._active else []
+
+    @property
+    def encoders(self):
+        return self._active.encoders if self._active else {}
+
+    @property
+    def version(self):
+        return self._active.version if self._active else None
+
+    def start_background_load(self):
+        """Load the model on a daemon thread so the caller can keep serving pages."""
+        if self.status != 'not_loaded':
+            return
+        self.status = 'loading'
+        threading.Thread(target=self._load_once, name='model-loader', daemon=True).start()
+
+    def after_fork(self):
+        """
+        Call in a forked gunicorn worker (post_fork in gunicorn.conf.py). A
+        finished model is inherited as-is, sharing its pages with the master;
+        a loader thread still running at fork time does not survive, so
+        loading restarts here as load_mode says. Other forked processes
+        (scoring and report pools, background jobs) never restart it: if one
+        uses the model, ensure_loaded notices the new pid and loads then.
+        """
+        if self._reset_after_fork() and self.load_mode == 'background':
+            self.start_background_load()
+
+    def _reset_after_fork(self):
+        """Drop load state inherited unfinished from the parent. Returns True when loading must start over."""
+        self._pid = os.getpid()
+        if self._done.is_set():
+            return False
+        self.status = 'not_loaded'
+        self._load_lock = threading.Lock()
+        self._done = threading.Event()
+        return True
+
+    def ensure_loaded(self, timeout=None):
+        """
+        Return True once the model is usable. Loads synchronously on first use
+        in lazy mode; otherwise waits up to `timeout` seconds for the loader.
+        """
+        if self._active is not None:
+            return True
+        if self._pid != os.getpid():
+            # Forked while the parent was loading: that thread is gone, load here
+            self._reset_after_fork()
+        if self.status == 'not_loaded':
+            self._load_once()
+        self._done.wait(timeout)
+        return self._active is not None
+
+    def _load_once(self):
+        with self._load_lock:
+            if self._done.is_set():
+                return
+            self.status = 'loading'
+            try:
+                self._load_model()
+            finally:
+                self.status = 'ready' if self._active is not None else 'failed'
+                self._done.set()
+
+    def _load_model(self):
+        """Load the trained model and associated data."""
+        try:
+            loaded = LoadedModel.from_file(self.model_file)
+            with self._swap_lock:
+                # A registry swap that landed while we were loading wins
+                if self._active is None:
+                    self._active = loaded
+            print("✓ Model loaded successfully.")
+        except FileNotFoundError:
+            self.load_error = f"Model file '{self.model_file}' not found."
+            print(f"✗ {self.load_error}")
+        except Exception as e:
+            self.load_error = f"Error loading model: {e}"
+            print(f"✗ {self.load_error}")
+
+    def swap(self, loaded):
+        """
+        Make `loaded` the active version with a single reference assignment.
+        Requests already holding the previous LoadedModel finish on it.
+        """
+        with self._swap_lock:
+            previous, self._active = self._active, loaded
+        # Entries are version-keyed already; drop the old version's to free the slots
+        self.cache.clear()
+        self.status = 'ready'
+        self.load_error = None
+        self._done.set()
+        print(f"✓ Model version '{loaded.version}' is now active.")
+        return previous
+
+    def active(self):
+        """The LoadedModel to use for one whole request."""
+        active = self._active
+        if active is None:
+            if not self.ensure_loaded():
+                raise RuntimeError(f"Model not loaded: {self.load_error}")
+            active = self._active
+        return active
+
+    def is_loaded(self):
+        """Check if model is loaded."""
+        return self._active is not None
+
+    def prepare_input(self, values, ids):
+        """Prepare input data from form values."""
+        return self.active().prepare_input(values, ids)
+
+    def prepare_batch(self, records):
+        """Validate and encode many patients into a feature-ordered float64 matrix."""
+        return self.active().prepare_batch(records)
+
+    def predict(self, input_data, active=None):
+        """
+        Make prediction and return models_results_plots, served from the
+        prediction cache when the same input was scored recently.
+        Pass `active` to score on a version pinned earlier in the request.
+        """
+        return (active or self.active()).predict(input_data, cache=self.cache)
+
+    def predict_batch(self, records):
+        """
+        Score many patients with a single predict_proba pass.
+        Returns arrays aligned with the input rows: 'prediction', 'probability',
+        'is_positive', plus the 'version' that produced them.
+        """
+        return self.active().predict_batch(records)
+
+
 # Singleton instance
-model_handler = ModelHandler()
\ No newline at end of file
+model_handler = ModelHandler(load_mode=MODEL_LOAD_MODE)
@@ -0,0 +1,226 @@
+# model_registry.py - Versioned model registry with validated hot swaps
+
+import hmac
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from flask import jsonify, request
+
+from config import ADMIN_TOKEN, FEATURE_GROUPS, MODEL_REGISTRY_DIR, MODEL_WATCH_INTERVAL
+from Utils.model_handler import LoadedModel
+
+CURRENT_FILE = 'CURRENT'
+GOLDEN_FILE = 'golden.json'
+MODEL_SUFFIXES = ('.pkl', '.joblib', '.npz')
+
+
+def default_golden_records():
+    """One untouched assessment form: number defaults and the first option of each choice."""
+    record = {}
+    for group in FEATURE_GROUPS.values():
+        for feature in group['features']:
+            if 'options' in feature:
+                record[feature['name']] = feature['options'][0]['value']
+            else:
+                record[feature['name']] = feature.get('default', 0)
+    return [record]
+
+
+class ModelRegistry:
+    """
+    Watches MODEL_REGISTRY_DIR and rolls the handler forward to the current
+    version: load off the request path, validate on the golden set, then swap.
+    """
+
+    def __init__(self, handler, registry_dir=MODEL_REGISTRY_DIR):
+        self.handler = handler
+        self.registry_dir = registry_dir
+        self.last_error = None
+        self._rejected = None
+        self._activate_lock = threading.Lock()
+        self._thread = None
+        self._interval = None
+
+    def versions(self):
+        """Available versions, sorted by name."""
+        if not os.path.isdir(self.registry_dir):
+            return []
+
+        found = []
+        for entry in sorted(os.listdir(self.registry_dir)):
+            path = os.path.join(self.registry_dir, entry)
+            stem, ext = os.path.splitext(entry)
+            if os.path.isfile(path) and ext in MODEL_SUFFIXES:
+                found.append(stem)
+            elif os.path.isfile(os.path.join(path, 'meta.json')):
+                found.append(entry)
+        return found
+
+    def path_for(self, version):
+        """Filesystem path of a registered version."""
+        candidates = [os.path.join(self.registry_dir, version)]
+        candidates += [os.path.join(self.registry_dir, version + ext) for ext in MODEL_SUFFIXES]
+        for path in candidates:
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"Model version '{version}' is not in {self.registry_dir}")
+
+    def current_version(self):
+        """The version named in CURRENT, else the last one by name."""
+        pointer = os.path.join(self.registry_dir, CURRENT_FILE)
+        if os.path.isfile(pointer):
+            with open(pointer) as f:
+                version = f.read().strip()
+            if version:
+                return version
+
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def set_current(self, version):
+        """Repoint CURRENT atomically so the watcher in every worker converges on `version`."""
+        self.path_for(version)
+        pointer = os.path.join(self.registry_dir, CURRENT_FILE)
+        tmp = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp, pointer)
+
+    def _golden(self):
+        """(records, expected predictions or None, minimum agreement)."""
+        path = os.path.join(self.registry_dir, GOLDEN_FILE)
+        if not os.path.isfile(path):
+            return default_golden_records(), None, 1.0
+
+        with open(path) as f:
+            golden = json.load(f)
+        return golden['records'], golden.get('expected'), float(golden.get('min_agreement', 1.0))
+
+    def validate(self, loaded):
+        """Score the golden set with a candidate; raise ValueError if it is not fit to serve."""
+        records, expected, min_agreement = self._golden()
+        result = loaded.predict_batch(records)
+
+        proba = result['probability']
+        if not (np.isfinite(proba).all() and ((proba >= 0) & (proba <= 1)).all()):
+            raise ValueError("golden set produced probabilities outside [0, 1]")
+
+        if expected is not None:
+            agreement = float(np.mean(result['prediction'] == np.asarray(expected)))
+            if agreement < min_agreement:
+                raise ValueError(
+                    f"golden set agreement {agreement:.1%} is below the required {min_agreement:.1%}"
+                )
+
+    def activate(self, version=None):
+        """Load, validate and swap in `version` (default: current). Returns the active version."""
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No model versions in {self.registry_dir}")
+
+        with self._activate_lock:
+            if version == self.handler.version:
+                return version
+            try:
+                loaded = LoadedModel.from_file(self.path_for(version), version)
+                self.validate(loaded)
+            except Exception as e:
+                self.last_error = f"Rejected model version '{version}': {e}"
+                print(f"✗ {self.last_error}")
+                raise
+
+            self.handler.swap(loaded)
+            self.last_error = None
+            return version
+
+    def poll(self):
+        """Activate the current version if it changed. Broken versions are not retried until modified."""
+        version = self.current_version()
+        if version is None or version == self.handler.version:
+            return
+
+        attempt = (version, os.path.getmtime(self.path_for(version)))
+        if attempt == self._rejected:
+            return
+        try:
+            self.activate(version)
+        except Exception:
+            self._rejected = attempt
+
+    def start_watcher(self, interval=MODEL_WATCH_INTERVAL):
+        """Poll the registry on a daemon thread (see after_fork for forked workers)."""
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+
+        self._interval = interval
+        self._thread = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        """
+        Call in a forked gunicorn worker (post_fork in gunicorn.conf.py): the
+        watcher thread was not copied, so it is started again if it ran.
+        """
+        self._activate_lock = threading.Lock()
+        if self._interval is not None:
+            self._thread = None
+            self.start_watcher(self._interval)
+
+    def _watch(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"✗ Model registry check failed: {e}")
+            time.sleep(self._interval)
+
+    def describe(self):
+        return {
+            'version': self.handler.version,
+            'status': self.handler.status,
+            'current': self.current_version(),
+            'available': self.versions(),
+            'last_error': self.last_error,
+            'cache': self.handler.cache.stats(),
+        }
+
+
+def register_admin_routes(server, registry, token=ADMIN_TOKEN):
+    """
+    GET  /admin/model         - active and available versions
+    POST /admin/model/reload  - optional JSON {"version": ...}; repoints CURRENT
+                                and loads it in the background (202 Accepted)
+    Both require the X-Admin-Token header; without a configured token they are not registered.
+    """
+    if not token:
+        return
+
+    def authorized():
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+
+    @server.route('/admin/model', methods=['GET'])
+    def model_status():
+        if not authorized():
+            return jsonify(error='unauthorized'), 401
+        return jsonify(registry.describe())
+
+    @server.route('/admin/model/reload', methods=['POST'])
+    def model_reload():
+        if not authorized():
+            return jsonify(error='unauthorized'), 401
+
+        version = (request.get_json(silent=True) or {}).get('version')
+        try:
+            if version:
+                registry.set_current(version)
+            version = registry.current_version()
+        except FileNotFoundError as e:
+            return jsonify(error=str(e)), 404
+        if version is None:
+            return jsonify(error=f"No model versions in {registry.registry_dir}"), 404
+
+        threading.Thread(target=registry.poll, name='model-reload', daemon=True).start()
+        return jsonify(requested=version, active=registry.handler.version), 202
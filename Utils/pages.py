@@ -1,7 +1,15 @@
 # pages.py - Page layouts and navigation components
+#
+# Page layouts are pure functions of config, so each is built once per process
+# and its serialized JSON is cached alongside an ETag.
+
+import hashlib
+from functools import lru_cache
 
 from dash import html, dcc
 import dash_bootstrap_components as dbc
+from flask import Response, request
+from plotly.io.json import to_json_plotly
 
 
 def create_navbar():
@@ -44,6 +52,7 @@ def create_navbar():
     )
 
 
+@lru_cache(maxsize=None)
 def create_home_page():
     """Create the home page with engaging visuals."""
     return html.Div([
@@ -268,6 +277,7 @@ def create_home_page():
     ])
 
 
+@lru_cache(maxsize=None)
 def create_tips_page():
     """Create the health tips and exercises page."""
 
@@ -473,4 +483,73 @@ def create_tips_page():
                 ], className="text-center mb-0", style={"color": "var(--text-secondary)"})
             ])
         ], className="py-4")
-    ])
\ No newline at end of file
+    ])
+
+
+@lru_cache(maxsize=None)
+def create_assessment_page():
+    """Create the risk assessment form page."""
+    from Utils.components import (
+        create_header, create_info_banner, create_predict_button,
+        create_footer, get_all_feature_cards
+    )
+
+    return html.Div([
+        dbc.Container([
+            create_header(),
+            create_info_banner(),
+            html.Div(get_all_feature_cards()),
+            create_predict_button(),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Spinner(
+                        html.Div(id="prediction-output"),
+                        color="primary",
+                        spinner_style={"width": "3rem", "height": "3rem"}
+                    )
+                ], xs=12, md=10, lg=8, className="mx-auto")
+            ]),
+            create_footer()
+        ], fluid=True, style={"maxWidth": "1200px"})
+    ], style={"paddingBottom": "3rem"})
+
+
+# Routed pages by name; anything else falls back to home
+PAGES = {
+    'home': create_home_page,
+    'assessment': create_assessment_page,
+    'tips': create_tips_page,
+}
+
+
+@lru_cache(maxsize=None)
+def serialized_page(name):
+    """Return (json bytes, ETag) for a page layout."""
+    # The encoder Dash itself uses for responses, so the bytes match what it would send
+    body = to_json_plotly(PAGES[name]()).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()[:20]
+
+
+def _json_response(body, etag):
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Revalidate every time: the ETag changes whenever a deploy changes the layout
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def register_page_routes(server):
+    """
+    GET /_pages/<name> - a page layout as Dash component JSON, built and
+    serialized once per process, with ETag / If-None-Match (304).
+    The clientside router (Utils/clientside.py) renders these.
+    """
+
+    @server.route('/_pages/<name>')
+    def page_layout(name):
+        if name not in PAGES:
+            return Response(status=404)
+        return _json_response(*serialized_page(name))
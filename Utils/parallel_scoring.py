@@ -0,0 +1,120 @@
+# parallel_scoring.py - Multi-process scoring over shared-memory matrices
+#
+# The encoded input matrix and the output vector live in
+# multiprocessing.shared_memory; workers receive only block names and row
+# ranges, so no patient data is pickled between processes.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import MODEL_FILE
+from Utils.model_handler import LoadedModel
+
+# Worker-process model, loaded once by _init_worker
+_model = None
+
+
+def _init_worker(model_file):
+    global _model
+    _model = LoadedModel.from_file(model_file)
+
+
+def _score_range(in_name, out_name, shape, start, stop):
+    """Score rows [start, stop) of the shared input into the shared output."""
+    # Workers share the parent's resource tracker, so attaching does not
+    # hand them ownership; the parent unlinks both blocks
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        X = np.ndarray(shape, dtype=np.float64, buffer=in_shm.buf)
+        out = np.ndarray((shape[0],), dtype=np.float64, buffer=out_shm.buf)
+        out[start:stop] = _model.predict_proba(X[start:stop])[:, 1]
+        del X, out
+    finally:
+        in_shm.close()
+        out_shm.close()
+    return stop - start
+
+
+class ParallelScorer:
+    """
+    Process pool that scores encoded, feature-ordered float64 matrices.
+    Reuse one instance (or `with ParallelScorer(...) as scorer`) across calls
+    so workers load the model only once.
+    """
+
+    def __init__(self, model_file=MODEL_FILE, processes=None, rows_per_task=100_000):
+        self.model = LoadedModel.from_file(model_file)
+        self.processes = processes or os.cpu_count()
+        self.rows_per_task = rows_per_task
+        self._pool = ProcessPoolExecutor(self.processes, initializer=_init_worker,
+                                         initargs=(model_file,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def shared_input(self, n_rows):
+        """
+        Allocate a shared input block and return (shm, matrix view) so callers
+        can fill the matrix in place and skip the copy in score().
+        """
+        shape = (n_rows, len(self.model.feature_names))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * shape[1] * 8))
+        return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    def score(self, X, shm=None):
+        """
+        Score X and return arrays aligned with its rows, like ModelHandler.predict_batch.
+        Pass the (shm, X) pair from shared_input() to score in place without a copy;
+        the caller then still owns (and unlinks) that block.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        n_rows = X.shape[0]
+        if X.ndim != 2 or X.shape[1] != len(self.model.feature_names):
+            raise ValueError(
+                f"Expected a 2-D array with {len(self.model.feature_names)} columns, got shape {X.shape}"
+            )
+
+        owns_input = shm is None
+        if owns_input:
+            shm, shared_X = self.shared_input(n_rows)
+            shared_X[:] = X
+            del shared_X
+        out_shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * 8))
+        try:
+            # Even split across processes, further cut so no task exceeds rows_per_task
+            step = min(self.rows_per_task, max(1, -(-n_rows // self.processes)))
+            futures = [
+                self._pool.submit(_score_range, shm.name, out_shm.name, X.shape,
+                                  start, min(start + step, n_rows))
+                for start in range(0, n_rows, step)
+            ]
+            for future in futures:
+                future.result()
+
+            probability = np.ndarray((n_rows,), dtype=np.float64, buffer=out_shm.buf).copy()
+        finally:
+            out_shm.close()
+            out_shm.unlink()
+            if owns_input:
+                shm.close()
+                shm.unlink()
+
+        classes = self.model.model.classes_
+        # Same tie-breaking as argmax over [1 - p, p] in predict_batch
+        predictions = np.where(probability > 1.0 - probability, classes[1], classes[0]).astype(int)
+        return {
+            'prediction': predictions,
+            'probability': probability,
+            'is_positive': predictions == 1,
+            'version': self.model.version
+        }
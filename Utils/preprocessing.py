@@ -0,0 +1,124 @@
+# preprocessing.py - The parsed training matrix, stored as float32 .npy and rebuilt only when the raw data changes
+#
+#   python -m Utils.preprocessing [--data data/alzheimers_disease_data.csv] [--out data/processed] [--force]
+#
+# PROCESSED_DATA_DIR holds:
+#   X.npy      the raw (unscaled) features, float32, column-major (each
+#              feature is one contiguous run), opened as a read-only memory map
+#   y.npy      the target, int8
+#   meta.json  feature names, the store format and the sha256 of the raw CSV
+# meta.json is written last, so a run that dies half way is simply redone.
+# Nothing is fitted here: standardization belongs to the training pipeline,
+# where it only ever sees the training split or CV fold.
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from config import PROCESSED_DATA_DIR, RAW_DATA_FILE
+
+TARGET = 'Diagnosis'
+# Identifiers and free text: not predictive, and not on the form
+DROP_COLUMNS = ['PatientID', 'DoctorInCharge']
+
+X_FILE = 'X.npy'
+Y_FILE = 'y.npy'
+META_FILE = 'meta.json'
+# Bumped when the stored arrays change meaning; older stores are rebuilt
+# (1 held features z-scored over every row)
+STORE_VERSION = 2
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def build(data_file=RAW_DATA_FILE, out_dir=PROCESSED_DATA_DIR, sha256=None):
+    """Parse the raw CSV and write its features and target as the processed store. Returns its metadata."""
+    import pandas as pd
+
+    df = pd.read_csv(data_file)
+    features = df.drop(columns=[TARGET] + [c for c in DROP_COLUMNS if c in df.columns])
+
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    _save(os.path.join(out_dir, X_FILE),
+          lambda f: np.save(f, np.asfortranarray(features.to_numpy(dtype=np.float32))))
+    _save(os.path.join(out_dir, Y_FILE), lambda f: np.save(f, df[TARGET].to_numpy(dtype=np.int8)))
+
+    meta = {
+        'version': STORE_VERSION,
+        'data_sha256': sha256 or file_sha256(data_file),
+        'features': list(features.columns),
+        'target': TARGET,
+        'n_rows': len(df),
+    }
+    _save(meta_path, lambda f: f.write(json.dumps(meta, indent=1).encode()))
+    return meta
+
+
+def read_meta(out_dir=PROCESSED_DATA_DIR):
+    """The stored metadata, or None when the store is missing or incomplete."""
+    try:
+        with open(os.path.join(out_dir, META_FILE)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(os.path.join(out_dir, name)) for name in (X_FILE, Y_FILE)):
+        return None
+    return meta
+
+
+def prepare(data_file=RAW_DATA_FILE, out_dir=PROCESSED_DATA_DIR, force=False):
+    """
+    Make sure out_dir holds the processed form of data_file: rebuilt when the
+    raw file's content hash or the store format differs from the one recorded
+    (or force is set), left alone otherwise. Returns the metadata.
+    """
+    sha256 = file_sha256(data_file)
+    meta = None if force else read_meta(out_dir)
+    if meta is not None and meta['data_sha256'] == sha256 and meta.get('version') == STORE_VERSION:
+        return meta
+    meta = build(data_file, out_dir, sha256)
+    print(f"✓ Processed {meta['n_rows']:,} rows x {len(meta['features'])} features into {out_dir}")
+    return meta
+
+
+def load_processed(out_dir=PROCESSED_DATA_DIR, mmap_mode='r'):
+    """(X, y, meta) from the store; X is memory-mapped unless mmap_mode is None."""
+    meta = read_meta(out_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No processed data in {out_dir}; run: python -m Utils.preprocessing")
+    X = np.load(os.path.join(out_dir, X_FILE), mmap_mode=mmap_mode)
+    y = np.load(os.path.join(out_dir, Y_FILE))
+    return X, y, meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the float32 training matrix from the raw CSV.")
+    parser.add_argument('--data', default=RAW_DATA_FILE, help="raw dataset CSV")
+    parser.add_argument('--out', default=PROCESSED_DATA_DIR, help="processed data directory")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the raw data is unchanged")
+    args = parser.parse_args()
+    meta = prepare(args.data, args.out, args.force)
+    print(f"✓ {args.out} is up to date with {args.data} (sha256 {meta['data_sha256'][:12]})")
+
+
+if __name__ == '__main__':
+    main()
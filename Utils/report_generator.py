@@ -1,5 +1,30 @@
+# report_generator.py - PDF risk assessment reports
+#
+# fpdf2 lays a report out once per template (risk band, number of digits in
+# the percentage and the list of fields) with placeholders in the dynamic
+# spots. Each report then only substitutes its values into the cached page
+# content and the PDF objects are written around it, so a bulk export of
+# thousands of reports streams page by page as one PDF or a ZIP. Templates
+# check fpdf2's file layout when they are built; if it is not the one
+# expected here, reports are laid out by fpdf2 directly.
+
+import hashlib
+import os
+import re
+import zipfile
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+
 from fpdf import FPDF
-from datetime import datetime
+
+_SLOT = re.compile(rb'@@(\w+)@@')
+_OBJECT = re.compile(rb'(?m)^(\d+) 0 obj\n(.*?)endobj\n', re.S)
+_CREATION_DATE = re.compile(rb'/CreationDate \(D:\d{14}Z\)')
 
 
 class PDFReport(FPDF):
@@ -17,24 +42,28 @@ class PDFReport(FPDF):
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
 
 
-def generate_report(input_data, result):
-    pdf = PDFReport()
+def _status_text(result):
+    status = "Elevated Risk Detected" if result['is_positive'] else "Low Risk Profile"
+    return f"{status} ({result['probability'] * 100:.1f}%)"
+
+
+def render_report(pdf, input_data, result, date):
+    """Draw one report on a new page of `pdf` (a PDFReport)."""
     pdf.add_page()
 
     # 1. Prediction Summary
     pdf.set_font('Arial', 'B', 12)
     pdf.set_text_color(0)
-    pdf.cell(0, 10, f'Assessment Date: {datetime.now().strftime("%Y-%m-%d %H:%M")}', 0, 1)
+    pdf.cell(0, 10, f'Assessment Date: {date}', 0, 1)
     pdf.ln(5)
 
     # Result Box
-    status = "Elevated Risk Detected" if result['is_positive'] else "Low Risk Profile"
     color = (239, 68, 68) if result['is_positive'] else (16, 185, 129)  # Red or Green
 
     pdf.set_fill_color(*color)
     pdf.set_text_color(255)
     pdf.set_font('Arial', 'B', 14)
-    pdf.cell(0, 15, f"{status} ({result['probability'] * 100:.1f}%)", 0, 1, 'C', 1)
+    pdf.cell(0, 15, _status_text(result), 0, 1, 'C', 1)
 
     # Disclaimer
     pdf.ln(5)
@@ -61,4 +90,335 @@ def generate_report(input_data, result):
         if pdf.get_x() > pdf.w - 30:
             pdf.ln()
 
-    return bytes(pdf.output(dest='S'))
\ No newline at end of file
+
+class _TemplateReport(PDFReport):
+    """PDFReport whose footer shows a sample page number of a chosen width."""
+
+    sample_page = 1
+
+    def page_no(self):
+        return self.sample_page
+
+
+class ReportTemplate:
+    """
+    A one-page report pre-rendered by fpdf2: the page content split into
+    static byte segments and named slots (DATE, STATUS, PAGE and V0..Vn for
+    the field values), plus the document's other PDF objects by number.
+    Raises ValueError when fpdf2 lays the file out differently than the
+    splicing below expects (see _check_layout).
+    """
+
+    def __init__(self, is_positive, int_digits, keys, page_digits=1):
+        # Every digit is equally wide in Helvetica, so sample numbers with the
+        # same number of digits center the status and footer exactly like the real ones
+        sample = {'is_positive': is_positive, 'probability': float('1' + '0' * (int_digits - 1)) / 100}
+        pdf = _TemplateReport()
+        pdf.sample_page = 10 ** (page_digits - 1)
+        pdf.set_compression(False)
+        render_report(pdf, {key: f'@@V{i}@@' for i, key in enumerate(keys)}, sample, '@@DATE@@')
+        raw = bytes(pdf.output())
+
+        # Slot values go through fpdf2's own text path: normalize_text checks
+        # the core font encoding and the font wraps the escaped text as "(...) Tj"
+        self._normalize = pdf.normalize_text
+        self._font = pdf.current_font
+        wrapped = self._font.encode_text('@@SLOT@@').split('@@SLOT@@')
+        if pdf.is_ttf_font or len(wrapped) != 2:
+            raise ValueError("Report text is not written with a core font")
+        self._prefix, self._suffix = len(wrapped[0]), len(wrapped[1])
+
+        self.header = raw[:raw.index(b'1 0 obj\n')]
+        self.objects = {int(num): body for num, body in _OBJECT.findall(raw)}
+        _check_layout(raw, self.objects)
+
+        # The page content stream (object 4) is the only stream in the file
+        stream = self.objects.pop(CONTENT_OBJ)
+        body = stream[stream.index(b'stream\n') + len(b'stream\n'):stream.rindex(b'\nendstream')]
+        status = self._encode(_status_text(sample))
+        page = b'(Page %d) Tj' % pdf.sample_page
+        if body.count(status) != 1 or body.count(page) != 1:
+            raise ValueError("The status or page number is not drawn exactly once")
+        body = body.replace(status, b'@@STATUS@@').replace(page, b'(Page @@PAGE@@) Tj')
+        parts = _SLOT.split(body)
+        # Alternating static bytes and slot names: [bytes, name, bytes, name, ..., bytes]
+        self.segments = parts[0::2]
+        self.slots = [name.decode() for name in parts[1::2]]
+        expected = ['DATE', 'STATUS', 'PAGE'] + [f'V{i}' for i in range(len(keys))]
+        if sorted(self.slots) != sorted(expected):
+            raise ValueError(f"Placeholders not found exactly once: {sorted(self.slots)}")
+
+    def _encode(self, text):
+        """Bytes fpdf2 writes between the parentheses of a Tj for `text`."""
+        shown = self._font.encode_text(self._normalize(text))
+        return shown[self._prefix:len(shown) - self._suffix].encode('latin-1')
+
+    def content(self, values):
+        """Deflated page content for slot values (str)."""
+        encoded = [self._encode(values[name]) for name in self.slots]
+        body = bytearray(self.segments[0])
+        for value, segment in zip(encoded, self.segments[1:]):
+            body += value
+            body += segment
+        return zlib.compress(body)
+
+
+# Object numbers in a template: the page tree, the catalog, the only page,
+# its content stream and the document info. Fonts and resources sit between.
+PAGES_OBJ, CATALOG_OBJ, PAGE_OBJ, CONTENT_OBJ, INFO_OBJ = 1, 2, 3, 4, 9
+
+
+def _check_layout(raw, objects):
+    """Raise ValueError unless `raw` is the one-page, one-stream file the object numbers above describe."""
+    if sorted(objects) != list(range(1, INFO_OBJ + 1)):
+        raise ValueError(f"Unexpected PDF objects: {sorted(objects)}")
+    streams = [num for num, body in objects.items() if b'stream\n' in body]
+    if streams != [CONTENT_OBJ]:
+        raise ValueError(f"Expected one content stream in object {CONTENT_OBJ}, found {streams}")
+    if (objects[PAGES_OBJ].count(b'/Count 1\n') != 1
+            or objects[PAGES_OBJ].count(b'/Kids [%d 0 R]' % PAGE_OBJ) != 1):
+        raise ValueError("The page tree does not hold exactly one page")
+    if objects[PAGE_OBJ].count(b'/Contents %d 0 R' % CONTENT_OBJ) != 1 or b'/Type /Page\n' not in objects[PAGE_OBJ]:
+        raise ValueError(f"Object {PAGE_OBJ} is not the page drawing object {CONTENT_OBJ}")
+    if b'/Type /Catalog\n' not in objects[CATALOG_OBJ]:
+        raise ValueError(f"Object {CATALOG_OBJ} is not the catalog")
+    if not _CREATION_DATE.search(objects[INFO_OBJ]):
+        raise ValueError(f"Object {INFO_OBJ} is not the document info")
+    trailer = raw[raw.rindex(b'trailer\n'):]
+    if b'/Root %d 0 R' % CATALOG_OBJ not in trailer or b'/Info %d 0 R' % INFO_OBJ not in trailer:
+        raise ValueError("The trailer points at other catalog or info objects")
+
+
+def _page_objects(index):
+    """(page, content) object numbers of the index-th page of a document."""
+    if index == 0:
+        return PAGE_OBJ, CONTENT_OBJ
+    return INFO_OBJ - 1 + 2 * index, INFO_OBJ + 2 * index
+
+
+def _pdf_chunks(pages, created):
+    """
+    Yield a PDF as byte chunks from (template, deflated content) pairs, one
+    per page, written as they arrive. Only each object's offset is kept
+    until the cross-reference table at the end.
+    """
+    offsets = array('Q', [0] * (INFO_OBJ + 1))
+    file_id = hashlib.md5(created.isoformat().encode())
+    position = 0
+    template = None
+
+    def obj(num, body):
+        nonlocal position
+        if num < len(offsets):
+            offsets[num] = position
+        else:
+            offsets.append(position)
+        chunk = b'%d 0 obj\n%sendobj\n' % (num, body)
+        position += len(chunk)
+        return chunk
+
+    count = 0
+    for count, page in enumerate(pages, 1):
+        if page is None:
+            raise ValueError(f"No usable template for page {count}, the PDF cannot be completed")
+        page_template, content = page
+        if template is None:
+            template = page_template
+            position = len(template.header)
+            yield template.header
+        page_num, content_num = _page_objects(count - 1)
+        file_id.update(content)
+        yield (obj(page_num, template.objects[PAGE_OBJ].replace(b'/Contents 4 0 R', b'/Contents %d 0 R' % content_num))
+               + obj(content_num, b'<<\n/Filter /FlateDecode\n/Length %d\n>>\nstream\n%s\nendstream\n'
+                     % (len(content), content)))
+    if template is None:
+        raise ValueError("A PDF needs at least one report")
+
+    # The page tree lists every page, so it goes out in slices too
+    pages_body = template.objects[PAGES_OBJ]
+    kid = b'%d 0 R' % PAGE_OBJ
+    if pages_body.count(b'/Count 1\n') != 1 or pages_body.count(kid) != 1:
+        raise ValueError("The template's page tree does not list exactly one page")
+    before, after = pages_body.replace(b'/Count 1\n', b'/Count %d\n' % count).split(kid)
+    offsets[PAGES_OBJ] = position
+    yield b'%d 0 obj\n%s' % (PAGES_OBJ, before)
+    position += len(b'%d 0 obj\n' % PAGES_OBJ) + len(before)
+    for start in range(0, count, 1024):
+        kids = b' '.join(b'%d 0 R' % _page_objects(i)[0] for i in range(start, min(start + 1024, count)))
+        if start:
+            kids = b' ' + kids
+        position += len(kids)
+        yield kids
+    position += len(after) + len(b'endobj\n')
+    yield after + b'endobj\n'
+    for num in range(CATALOG_OBJ, INFO_OBJ):
+        if num not in (PAGE_OBJ, CONTENT_OBJ):
+            yield obj(num, template.objects[num])
+    yield obj(INFO_OBJ, _CREATION_DATE.sub(created.strftime('/CreationDate (D:%Y%m%d%H%M%SZ)').encode(),
+                                           template.objects[INFO_OBJ]))
+
+    xref_at = position
+    yield b'xref\n0 %d\n0000000000 65535 f \n' % len(offsets)
+    for start in range(1, len(offsets), 1024):
+        yield b''.join(b'%010d 00000 n \n' % offset for offset in offsets[start:start + 1024])
+    file_id = file_id.hexdigest().upper().encode()
+    yield (b'trailer\n<<\n/Size %d\n/Root %d 0 R\n/Info %d 0 R\n/ID [<%s><%s>]\n>>\nstartxref\n%d\n%%%%EOF\n'
+           % (len(offsets), CATALOG_OBJ, INFO_OBJ, file_id, file_id, xref_at))
+
+
+@lru_cache(maxsize=64)
+def get_template(is_positive, int_digits, keys, page_digits=1):
+    """
+    The cached template for one risk band, percentage width, field list and
+    page-number width, or None when fpdf2's output cannot be spliced (reports
+    are then laid out by render_report instead).
+    """
+    try:
+        return ReportTemplate(is_positive, int_digits, keys, page_digits)
+    except ValueError as e:
+        print(f"WARNING: Unexpected fpdf2 output ({e}), rendering reports without templates")
+        return None
+
+
+def assessment_date():
+    """The current time as printed in a report's "Assessment Date"."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
+
+
+def _template_key(input_data, result, page=1):
+    """get_template arguments for one report shown as page number `page`."""
+    percentage = f"{result['probability'] * 100:.1f}"
+    return bool(result['is_positive']), len(percentage) - 2, tuple(input_data), len(str(page))
+
+
+def _report_page(input_data, result, page=1, date=None):
+    """(template, deflated content) for one report shown as page number `page`; None without a template."""
+    template = get_template(*_template_key(input_data, result, page))
+    if template is None:
+        return None
+
+    values = {f'V{i}': str(value) for i, value in enumerate(input_data.values())}
+    values['DATE'] = date or assessment_date()
+    values['STATUS'] = _status_text(result)
+    values['PAGE'] = str(page)
+    return template, template.content(values)
+
+
+def _render_pdf(items, date=None):
+    """A PDF laid out by fpdf2 with a page per (input_data, result) pair, for when no template can be used."""
+    pdf = PDFReport()
+    for input_data, result in items:
+        render_report(pdf, input_data, result, date or assessment_date())
+    return bytes(pdf.output())
+
+
+def generate_report(input_data, result, date=None):
+    """
+    One report as PDF bytes; input_data holds readable field values (see
+    Utils.labels) and date the assessment date text (default: now).
+    """
+    page = _report_page(input_data, result, date=date)
+    if page is None:
+        return _render_pdf([(input_data, result)], date)
+    return b''.join(_pdf_chunks([page], datetime.now(timezone.utc)))
+
+
+def _generate_many(items):
+    return [generate_report(input_data, result) for input_data, result in items]
+
+
+def generate_reports(items, workers=None, chunk_size=256):
+    """
+    Render many (input_data, result) pairs, yielding PDF bytes in input order.
+    Chunks of chunk_size reports go to a process pool of `workers` processes
+    (default: all cores), at most two chunks per worker in flight, so memory
+    does not grow with the number of items; workers=1 renders in this process.
+    """
+    workers = workers or os.cpu_count()
+    if workers <= 1:
+        for input_data, result in items:
+            yield generate_report(input_data, result)
+        return
+
+    items = iter(items)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in iter(lambda: list(islice(items, chunk_size)), []):
+            pending.append(pool.submit(_generate_many, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def iter_reports_pdf(items):
+    """
+    One multi-page PDF with a page per (input_data, result) pair, yielded in
+    chunks as each page is rendered (e.g. for a streamed HTTP response).
+    Every template the document needs is checked before the first byte:
+    if any is unusable the whole document is laid out by fpdf2 instead and
+    yielded as a single chunk, so a stream is never cut short.
+    """
+    created = datetime.now(timezone.utc)
+    items = list(items)
+    # A handful of variants (risk band, digits, page-number width), built once each by the cache
+    keys = {_template_key(input_data, result, page) for page, (input_data, result) in enumerate(items, 1)}
+    if not all(get_template(*key) for key in keys):
+        yield _render_pdf(items)
+        return
+    pages = (_report_page(input_data, result, page) for page, (input_data, result) in enumerate(items, 1))
+    yield from _pdf_chunks(pages, created)
+
+
+class _ChunkBuffer:
+    """Write-only file object for zipfile that hands out what was written so far."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def _add_reports(archive, items, name_format, workers):
+    """Add one PDF entry per report to an open ZipFile, yielding after each."""
+    timestamp = datetime.now().timetuple()[:6]
+    for i, report in enumerate(generate_reports(items, workers=workers), 1):
+        # PDF content is already deflated, so entries are stored as they are
+        archive.writestr(zipfile.ZipInfo(name_format.format(i), timestamp), report, zipfile.ZIP_STORED)
+        yield
+
+
+def iter_reports_zip(items, name_format='report_{:05d}.pdf', workers=1):
+    """
+    A ZIP archive with one PDF per (input_data, result) pair, named by
+    name_format (formatted with the 1-based position), yielded in chunks as
+    each entry is written. workers > 1 renders on a process pool.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for _ in _add_reports(archive, items, name_format, workers):
+            yield from buffer.take()
+    # The central directory, written on close
+    yield from buffer.take()
+
+
+def write_reports_pdf(items, fileobj):
+    """Write a multi-page PDF of all reports to a binary file object."""
+    for chunk in iter_reports_pdf(items):
+        fileobj.write(chunk)
+
+
+def write_reports_zip(items, fileobj, name_format='report_{:05d}.pdf', workers=1):
+    """Write a ZIP of per-report PDFs to a binary file object."""
+    with zipfile.ZipFile(fileobj, 'w') as archive:
+        for _ in _add_reports(archive, items, name_format, workers):
+            pass
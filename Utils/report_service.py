@@ -0,0 +1,116 @@
+# report_service.py - PDF reports for the current form, served as plain file downloads
+#
+# A report is identified by an HMAC, under a server-side secret, of the model
+# input and the prediction, so a URL cannot be derived from a guessed patient
+# profile and every click on the same form reuses the same entry. The store
+# keeps the readable field values and the result; the PDF is rendered from its
+# cached template when GET /_reports/<key>.pdf is served, dated at that moment.
+
+import hashlib
+import hmac
+import io
+import json
+import os
+import secrets
+
+from flask import Response, send_file
+
+from config import REPORT_CACHE_DIR, REPORT_CACHE_SIZE, REPORT_CACHE_TTL, REPORT_SECRET, REPORT_SECRET_FILE
+from Utils.cache import create_cache
+from Utils.labels import get_readable_data
+from Utils.report_generator import generate_report
+
+REPORT_FILENAME = "neuropredict_report.pdf"
+
+_store = None
+_secret = None
+
+
+def get_report_store():
+    """Report key -> (readable input, result), on disk when REPORT_CACHE_DIR is set and diskcache is installed."""
+    global _store
+    if _store is None:
+        _store = create_cache(REPORT_CACHE_DIR, REPORT_CACHE_SIZE, REPORT_CACHE_TTL,
+                              entry_bytes=2 * 1024)
+    return _store
+
+
+def _read_or_create_secret(path):
+    """The key in `path`, created with a random one first if it does not exist yet."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            # link() fails if another process got there first, so all of them end up with its key
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    with open(path) as f:
+        return f.read().strip()
+
+
+def get_report_secret():
+    """The HMAC key for report keys: REPORT_SECRET, else the shared REPORT_SECRET_FILE, else per process."""
+    global _secret
+    if _secret is None:
+        if REPORT_SECRET:
+            secret = REPORT_SECRET
+        elif REPORT_SECRET_FILE:
+            secret = _read_or_create_secret(REPORT_SECRET_FILE)
+        else:
+            secret = secrets.token_hex(32)
+        _secret = secret.encode()
+    return _secret
+
+
+def report_key(input_data, result):
+    """HMAC of the encoded model input and the prediction shown in the report."""
+    payload = json.dumps({
+        'input': sorted((name, str(value)) for name, value in input_data.items()),
+        'is_positive': bool(result['is_positive']),
+        'probability': float(result['probability']),
+    })
+    return hmac.new(get_report_secret(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def ensure_report(input_data, result):
+    """Store what the report for this input and result shows, unless it is stored already. Returns its key."""
+    key = report_key(input_data, result)
+    store = get_report_store()
+    if store.get(key) is None:
+        store.put(key, (get_readable_data(input_data),
+                        {'is_positive': bool(result['is_positive']), 'probability': float(result['probability'])}))
+    return key
+
+
+def report_path(key):
+    """Server path of a stored report (prefix it with the app's requests_pathname_prefix)."""
+    return f"/_reports/{key}.pdf"
+
+
+def register_report_routes(server):
+    """
+    GET /_reports/<key>.pdf - a stored report rendered as a file download
+    dated now, with ETag / If-None-Match and Range support. 404 once it has expired.
+    """
+
+    @server.route('/_reports/<key>.pdf')
+    def download_report_file(key):
+        stored = get_report_store().get(key)
+        if stored is None:
+            return Response("Report expired, please download it again.", status=404)
+
+        pdf_bytes = generate_report(*stored)
+        # The date changes the bytes, so the ETag follows the bytes rather than the key
+        response = send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True,
+                             download_name=REPORT_FILENAME, etag=hashlib.sha256(pdf_bytes).hexdigest(),
+                             conditional=True)
+        # Private to the browser, and revalidated since a later download is dated later
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
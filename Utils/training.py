@@ -0,0 +1,241 @@
+# training.py - Train the candidate models and write the bundle ModelHandler serves
+#
+#   python -m Utils.training [--out models/alzheimers_model_data.pkl] [--n-jobs -1] [--plots DIR]
+#
+# Training reads the float32 matrix Utils.preprocessing keeps in
+# PROCESSED_DATA_DIR (memory-mapped, rebuilt first if the raw CSV changed).
+# Each candidate is a StandardScaler -> SMOTE -> classifier pipeline tuned by
+# a cross-validated grid search that runs on all cores, so the scaler is only
+# ever fitted on the training split or the CV fold it is scored against. The
+# winner is saved as it was refitted on the training split, together with the
+# scaler-folded TransformGraph every scoring path runs
+# (Utils/transform_graph.py). Searches and the fitted scaler and SMOTE steps
+# are cached with joblib.Memory under TRAINING_CACHE_DIR, keyed on the data
+# and the estimator parameters, so a re-run only refits what changed.
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score, roc_curve
+)
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from config import MODEL_FILE, PROCESSED_DATA_DIR, RAW_DATA_FILE, TRAINING_CACHE_DIR, TRAINING_N_JOBS
+from Utils.preprocessing import load_processed, prepare
+from Utils.transform_graph import TransformGraph
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+CV_FOLDS = 5
+SCORING = 'roc_auc'
+
+
+def candidates():
+    """{name: (pipeline, parameter grid)} for every model family tried."""
+    return {
+        'logistic_regression': (
+            Pipeline([
+                ('scaler', StandardScaler()),
+                ('smote', SMOTE(random_state=RANDOM_STATE)),
+                ('classifier', LogisticRegression(class_weight='balanced', max_iter=1000,
+                                                  solver='saga', random_state=RANDOM_STATE)),
+            ]),
+            {'classifier__C': [0.001, 0.01, 0.1, 1.0, 10.0]},
+        ),
+        'random_forest': (
+            Pipeline([
+                ('scaler', StandardScaler()),
+                ('smote', SMOTE(random_state=RANDOM_STATE)),
+                ('classifier', RandomForestClassifier(n_estimators=200, random_state=RANDOM_STATE)),
+            ]),
+            {'classifier__max_depth': [None, 10], 'classifier__min_samples_leaf': [1, 4]},
+        ),
+    }
+
+
+def load_dataset(data_file=RAW_DATA_FILE, processed_dir=PROCESSED_DATA_DIR):
+    """
+    (X, y, meta): the memory-mapped raw features, the target and the store's
+    metadata, reprocessing data_file first if it changed.
+    """
+    prepare(data_file, processed_dir)
+    return load_processed(processed_dir)
+
+
+def run_search(pipeline, grid, X, y, n_jobs, cache_dir):
+    """
+    Grid search over `grid` with stratified CV, refit on all of X. The
+    pipeline's scaler and SMOTE fits are cached per fold in cache_dir, so
+    grid points (and re-runs) that only change the classifier reuse them.
+    """
+    if cache_dir:
+        pipeline = pipeline.set_params(memory=joblib.Memory(os.path.join(cache_dir, 'steps'), verbose=0))
+    search = GridSearchCV(pipeline, grid, scoring=SCORING, n_jobs=n_jobs, refit=True,
+                          cv=StratifiedKFold(CV_FOLDS, shuffle=True, random_state=RANDOM_STATE))
+    search.fit(X, y)
+    # The cache directory is not part of the served model
+    search.best_estimator_.set_params(memory=None)
+    return search
+
+
+def evaluate(model, X, y):
+    """Hold-out metrics for a fitted model."""
+    proba = model.predict_proba(X)[:, 1]
+    pred = model.predict(X)
+    return {
+        'accuracy': accuracy_score(y, pred),
+        'precision': precision_score(y, pred),
+        'recall': recall_score(y, pred),
+        'f1': f1_score(y, pred),
+        'roc_auc': roc_auc_score(y, proba),
+    }
+
+
+def save_plots(results, X_test, y_test, features, plot_dir):
+    """Confusion matrices, ROC curves and feature importances like models_results_plots/."""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("WARNING: 'matplotlib' is not installed, skipping plots. Run: pip install matplotlib")
+        return
+
+    os.makedirs(plot_dir, exist_ok=True)
+    comparison = plt.figure(figsize=(7, 6))
+    for name, result in results.items():
+        model = result['model']
+        title = name.replace('_', ' ').title()
+        proba = model.predict_proba(X_test)[:, 1]
+        fpr, tpr, _ = roc_curve(y_test, proba)
+        auc = result['metrics']['roc_auc']
+
+        fig, ax = plt.subplots(figsize=(6, 5))
+        matrix = confusion_matrix(y_test, model.predict(X_test))
+        ax.imshow(matrix, cmap='Blues')
+        for (i, j), count in np.ndenumerate(matrix):
+            ax.text(j, i, str(count), ha='center', va='center')
+        ax.set(title=f'Confusion Matrix - {title}', xlabel='Predicted', ylabel='Actual',
+               xticks=[0, 1], yticks=[0, 1])
+        fig.savefig(os.path.join(plot_dir, f'confusion_matrix_{name}.png'), bbox_inches='tight')
+        plt.close(fig)
+
+        fig, ax = plt.subplots(figsize=(6, 5))
+        ax.plot(fpr, tpr, label=f'AUC = {auc:.3f}')
+        ax.plot([0, 1], [0, 1], linestyle='--', color='grey')
+        ax.set(title=f'ROC Curve - {title}', xlabel='False Positive Rate', ylabel='True Positive Rate')
+        ax.legend(loc='lower right')
+        fig.savefig(os.path.join(plot_dir, f'roc_curve_{name}.png'), bbox_inches='tight')
+        plt.close(fig)
+        comparison.gca().plot(fpr, tpr, label=f'{title} (AUC = {auc:.3f})')
+
+        classifier = model.named_steps['classifier']
+        importance = getattr(classifier, 'feature_importances_', None)
+        if importance is None:
+            importance = np.abs(classifier.coef_[0])
+        order = np.argsort(importance)[-15:]
+        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.barh(np.asarray(features)[order], importance[order])
+        ax.set(title=f'Top Features - {title}', xlabel='Importance')
+        fig.savefig(os.path.join(plot_dir, f'feature_importance_{name}.png'), bbox_inches='tight')
+        plt.close(fig)
+
+    ax = comparison.gca()
+    ax.plot([0, 1], [0, 1], linestyle='--', color='grey')
+    ax.set(title='ROC Comparison', xlabel='False Positive Rate', ylabel='True Positive Rate')
+    ax.legend(loc='lower right')
+    comparison.savefig(os.path.join(plot_dir, 'roc_comparison.png'), bbox_inches='tight')
+    plt.close(comparison)
+    print(f"✓ Plots written to {plot_dir}")
+
+
+def train(data_file=RAW_DATA_FILE, out_file=MODEL_FILE, n_jobs=TRAINING_N_JOBS,
+          cache_dir=TRAINING_CACHE_DIR, plot_dir=None, processed_dir=PROCESSED_DATA_DIR):
+    """
+    Tune every candidate, keep the one with the best cross-validated score
+    and write it as a {'model', 'features', 'encoders', 'graph', ...} bundle
+    to out_file. Returns the bundle.
+    """
+    X, y, meta = load_dataset(data_file, processed_dir)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, stratify=y, random_state=RANDOM_STATE)
+
+    # Whole searches are cached too: keyed on the pipeline, grid and data,
+    # not on how many cores ran them
+    search = run_search
+    if cache_dir:
+        search = joblib.Memory(cache_dir, verbose=0).cache(run_search, ignore=['n_jobs', 'cache_dir'])
+
+    results = {}
+    for name, (pipeline, grid) in candidates().items():
+        start = time.perf_counter()
+        fitted = search(pipeline, grid, X_train, y_train, n_jobs, cache_dir)
+        results[name] = {
+            'model': fitted.best_estimator_,
+            'params': fitted.best_params_,
+            'cv_score': float(fitted.best_score_),
+            'metrics': evaluate(fitted.best_estimator_, X_test, y_test),
+        }
+        metrics = results[name]['metrics']
+        print(f"✓ {name}: CV {SCORING} {fitted.best_score_:.4f}, hold-out accuracy "
+              f"{metrics['accuracy']:.4f}, {SCORING} {metrics['roc_auc']:.4f} "
+              f"({time.perf_counter() - start:.1f}s) {fitted.best_params_}")
+
+    best = max(results, key=lambda name: results[name]['cv_score'])
+    # Scaler included, so the bundle scores raw form values
+    model = results[best]['model']
+    bundle = {
+        'model': model,
+        'features': meta['features'],
+        # Every raw column is numeric already (option fields are stored as codes)
+        'encoders': {},
+        # Shares the classifier with 'model', so pickling stores it once
+        'graph': TransformGraph.from_model(model, meta['features']).to_dict(),
+        'model_name': best,
+        'params': results[best]['params'],
+        'cv_score': results[best]['cv_score'],
+        'metrics': results[best]['metrics'],
+        'data_sha256': meta['data_sha256'],
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+    os.makedirs(os.path.dirname(out_file) or '.', exist_ok=True)
+    # Forests pickle large; compression cuts the file about 4x at a small load cost
+    joblib.dump(bundle, out_file, compress=3)
+    print(f"✓ Saved {best} ({len(bundle['features'])} features) to {out_file}")
+
+    if plot_dir:
+        save_plots(results, X_test, y_test, meta['features'], plot_dir)
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Alzheimer's risk model bundle.")
+    parser.add_argument('--data', default=RAW_DATA_FILE, help="raw dataset CSV")
+    parser.add_argument('--out', default=MODEL_FILE, help="bundle to write (default: config.MODEL_FILE)")
+    parser.add_argument('--n-jobs', type=int, default=TRAINING_N_JOBS,
+                        help="parallel CV fits (-1: all cores)")
+    parser.add_argument('--processed-dir', default=PROCESSED_DATA_DIR,
+                        help="where the parsed training matrix is kept (see Utils.preprocessing)")
+    parser.add_argument('--cache-dir', default=TRAINING_CACHE_DIR,
+                        help="joblib.Memory cache directory ('' disables caching)")
+    parser.add_argument('--plots', metavar='DIR', help="also write evaluation plots to DIR")
+    args = parser.parse_args()
+    train(args.data, args.out, args.n_jobs, args.cache_dir, args.plots, args.processed_dir)
+
+
+if __name__ == '__main__':
+    # Go through the importable module so joblib.Memory files cached searches
+    # under Utils.training for both `python -m` and library callers
+    from Utils.training import main
+    main()
@@ -0,0 +1,91 @@
+# transform_graph.py - A fitted model reduced to what runs at predict time: one affine pass, then the estimator
+#
+# Every leading StandardScaler of a pipeline is folded into a single
+# (mean, scale) pair applied to the whole feature-ordered matrix at once,
+# samplers such as SMOTE (fit-time only) are dropped and whatever follows is
+# the estimator. Training stores the graph in the model bundle under 'graph',
+# tagged with GRAPH_FORMAT_VERSION; LoadedModel rebuilds it from 'model' for
+# older bundles and bare pipelines, so the form, batch, API and offline
+# scoring paths all run the same graph.
+
+import numpy as np
+
+GRAPH_FORMAT_VERSION = 1
+
+
+def _is_sampler(step):
+    return step is None or step == 'passthrough' or hasattr(step, 'fit_resample')
+
+
+class TransformGraph:
+    """
+    (X - mean) / scale followed by estimator.predict_proba. mean and scale
+    are None when the model has no scaler in front.
+    """
+
+    def __init__(self, mean, scale, estimator, feature_names=()):
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.estimator = estimator
+        self.classes_ = estimator.classes_
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def from_model(cls, model, feature_names=()):
+        """Fold the leading StandardScalers of a fitted (imblearn or sklearn) pipeline; other models pass through."""
+        steps = getattr(model, 'steps', None)
+        if steps is None:
+            return cls(None, None, model, feature_names)
+
+        mean = scale = None
+        i = 0
+        for i, (_, step) in enumerate(steps[:-1]):
+            if _is_sampler(step):
+                continue
+            if type(step).__name__ != 'StandardScaler':
+                break
+            step_mean = step.mean_ if step.with_mean else 0.0
+            step_scale = step.scale_ if step.with_std else 1.0
+            if mean is None:
+                mean = np.zeros(step.n_features_in_) + step_mean
+                scale = np.ones(step.n_features_in_) * step_scale
+            else:
+                # ((x - m1) / s1 - m2) / s2 == (x - (m1 + m2 * s1)) / (s1 * s2)
+                mean = mean + step_mean * scale
+                scale = scale * step_scale
+        else:
+            i = len(steps) - 1
+
+        rest = [step for _, step in steps[i:-1] if not _is_sampler(step)]
+        estimator = model[i:] if rest else steps[-1][1]
+        return cls(mean, scale, estimator, feature_names)
+
+    def to_dict(self):
+        """The serializable form stored in the model bundle."""
+        return {
+            'format_version': GRAPH_FORMAT_VERSION,
+            'mean': self.mean,
+            'scale': self.scale,
+            'estimator': self.estimator,
+            'features': self.feature_names,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        version = data.get('format_version')
+        if version != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported transform graph format {version!r} "
+                             f"(this version reads {GRAPH_FORMAT_VERSION})")
+        return cls(data['mean'], data['scale'], data['estimator'], data['features'])
+
+    def transform(self, X):
+        """The scaled copy of a feature-ordered matrix, built in one float64 buffer."""
+        if self.mean is None:
+            return np.asarray(X, dtype=np.float64)
+        # Subtract then divide, like StandardScaler, so results match it bit for bit
+        Z = np.subtract(X, self.mean, dtype=np.float64)
+        Z /= self.scale
+        return Z
+
+    def predict_proba(self, X):
+        return self.estimator.predict_proba(self.transform(X))
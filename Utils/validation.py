@@ -0,0 +1,54 @@
+# validation.py - Range and option checks derived from config.FEATURE_GROUPS
+
+import numpy as np
+
+from config import FEATURE_GROUPS
+
+FEATURES = {f['name']: f for group in FEATURE_GROUPS.values() for f in group['features']}
+
+# Cap on reported problems so one bad bulk upload can't produce a huge response
+MAX_ERRORS = 100
+
+
+def _column(records, name):
+    """One feature across all records as float64, NaN where missing or non-numeric."""
+    raw = [r.get(name) for r in records]
+    try:
+        return np.asarray(raw, dtype=np.float64)
+    except (TypeError, ValueError):
+        col = np.full(len(raw), np.nan)
+        for i, val in enumerate(raw):
+            try:
+                col[i] = float(val)
+            except (TypeError, ValueError):
+                pass
+        return col
+
+
+def validate_records(records):
+    """
+    Check every assessment feature of every record, one column at a time.
+    Returns a list of {'row', 'field', 'error'} dicts; empty when all records are valid.
+    """
+    errors = []
+
+    for name, feature in FEATURES.items():
+        col = _column(records, name)
+        missing = np.isnan(col)
+        checks = [(missing, "is required and must be numeric")]
+
+        if 'options' in feature:
+            allowed = [opt['value'] for opt in feature['options']]
+            checks.append((~missing & ~np.isin(col, allowed), f"must be one of {allowed}"))
+        elif 'min' in feature or 'max' in feature:
+            low, high = feature.get('min', -np.inf), feature.get('max', np.inf)
+            checks.append((~missing & ((col < low) | (col > high)), f"must be between {low} and {high}"))
+
+        for mask, message in checks:
+            for row in np.flatnonzero(mask):
+                errors.append({'row': int(row), 'field': name, 'error': message})
+                if len(errors) >= MAX_ERRORS:
+                    return errors
+
+    errors.sort(key=lambda e: e['row'])
+    return errors
@@ -1,3 +1,5 @@
+import importlib.util
+
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
@@ -11,18 +13,39 @@ from Utils.components import (
     get_all_feature_cards,
     create_chat_component,
 )
-from Utils.pages import create_navbar
+from Utils.api import register_api
+from Utils.clientside import register_clientside_callbacks
+from Utils.metrics import register_metrics
+from Utils.pages import create_navbar, register_page_routes
+from Utils.report_service import register_report_routes
+from Utils.model_handler import model_handler
+from Utils.model_registry import ModelRegistry, register_admin_routes
 from callbacks import register_callbacks
+from config import CHAT_JOB_DIR
 
-# Check for imbalanced-learn
-try:
-    import imblearn
-except ImportError:
+# Check for imbalanced-learn without importing it (and sklearn) at boot
+if importlib.util.find_spec("imblearn") is None:
     print("WARNING: 'imbalanced-learn' is not installed. Run: pip install imbalanced-learn")
 
 # Brain emoji favicon as base64 SVG
 FAVICON = "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🧠</text></svg>"
 
+def create_background_manager():
+    """
+    Local job queue for background callbacks (chat replies and PDF reports).
+    None, so they run in the request, when CHAT_JOB_DIR is empty or diskcache is missing.
+    """
+    if not CHAT_JOB_DIR:
+        return None
+    try:
+        import diskcache
+    except ImportError:
+        print("WARNING: 'diskcache' is not installed, so chat replies and reports block a web worker. "
+              "Run: pip install \"dash[diskcache]\"")
+        return None
+    return dash.DiskcacheManager(diskcache.Cache(CHAT_JOB_DIR))
+
+
 def create_app():
     """Create and configure the Dash application."""
 
@@ -65,7 +88,30 @@ def create_app():
     ], id="main-container")
 
     # Register callbacks
-    register_callbacks(application)
+    register_callbacks(application, create_background_manager())
+
+    # Routing, navbar and range checks run in the browser, fed by the cached page layouts
+    register_clientside_callbacks(application)
+    register_page_routes(application.server)
+
+    # Rendered PDF reports, downloaded as plain files
+    register_report_routes(application.server)
+
+    # Load the model as MODEL_LOAD_MODE says (importing model_handler does not)
+    model_handler.start()
+
+    # Hot model reload: follow the versioned registry and expose the admin endpoints
+    registry = ModelRegistry(model_handler)
+    registry.start_watcher()
+    # gunicorn's post_fork restarts its watcher in each worker
+    application.server.extensions['model_registry'] = registry
+    register_admin_routes(application.server, registry)
+
+    # JSON scoring API for machine clients
+    register_api(application.server, model_handler)
+
+    # Request timings and sizes for every route, served at /metrics
+    register_metrics(application.server)
 
     return application
 
@@ -0,0 +1,31 @@
+# bench_batch_predict.py - Rows/sec of ModelHandler.predict_batch vs looping predict
+#
+# Run from the repo root:  python -m benchmarks.bench_batch_predict
+
+from Utils.model_handler import ModelHandler
+from benchmarks.common import BENCH_MODEL_FILE, best_of, load_records
+
+SIZES = [1, 100, 10_000, 1_000_000]
+# The per-row loop is linear in n, so it is timed on at most this many rows
+LOOP_CAP = 2_000
+
+
+def main():
+    handler = ModelHandler(BENCH_MODEL_FILE)
+    all_records = load_records(max(SIZES))
+
+    print(f"{'rows':>10} {'loop rows/s':>14} {'batch rows/s':>14} {'speedup':>9}")
+    for n in SIZES:
+        records = all_records[:n]
+        loop_rows = records[:LOOP_CAP]
+
+        loop_time = best_of(lambda: [handler.predict(r) for r in loop_rows], repeat=1)
+        batch_time = best_of(lambda: handler.predict_batch(records), repeat=1 if n > 10_000 else 3)
+
+        loop_rate = len(loop_rows) / loop_time
+        batch_rate = n / batch_time
+        print(f"{n:>10,} {loop_rate:>14,.0f} {batch_rate:>14,.0f} {batch_rate / loop_rate:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# bench_chat_cache.py - Chat reply latency and backend calls with the shared FAQ replies and reply cache
+#
+# Run from the repo root:  python -m benchmarks.bench_chat_cache
+# Uses the offline fake backend with LLM-like per-word latency, so no API key
+# or network is needed.
+
+import random
+import time
+
+import numpy as np
+
+from Utils import chatbot_service
+from Utils.chatbot_service import FakeBackend, get_chat_response
+from Utils.prediction_cache import PredictionCache
+from benchmarks.common import load_records
+
+N_MESSAGES = 200
+TOKEN_DELAY = 0.01
+
+# Suggestion chips plus a handful of free-text questions users repeat
+CHIPS = ["Analyze my data", "What is LDL?", "Risks of hypertension?"]
+FREE_TEXT = ["Is my blood pressure too high?", "How does sleep affect memory?",
+             "what is MMSE", "Can exercise lower my risk?", "Is 160 LDL bad?"]
+
+
+def workload(seed=0):
+    """(question, patient form) pairs: a few patients, mostly chip clicks."""
+    rng = random.Random(seed)
+    patients = load_records(5)
+    return [(rng.choice(CHIPS if rng.random() < 0.6 else FREE_TEXT), rng.choice(patients))
+            for _ in range(N_MESSAGES)]
+
+
+def run(messages, cached):
+    backend = FakeBackend(delay=TOKEN_DELAY)
+    # Fresh in-process cache per run; size 0 disables it
+    chatbot_service._response_cache = PredictionCache(2048 if cached else 0, 3600)
+    faq = chatbot_service.FAQ_QUESTIONS
+    if not cached:
+        chatbot_service.FAQ_QUESTIONS = {}
+
+    latencies = []
+    try:
+        for question, patient in messages:
+            start = time.perf_counter()
+            get_chat_response(question, patient, backend=backend)
+            latencies.append((time.perf_counter() - start) * 1e3)
+    finally:
+        chatbot_service.FAQ_QUESTIONS = faq
+    return np.array(latencies), backend.calls
+
+
+def main():
+    messages = workload()
+    print(f"{N_MESSAGES} messages, fake backend at {TOKEN_DELAY * 1e3:.0f} ms/word\n")
+    print(f"{'setup':<22}{'backend calls':>14}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}")
+    for name, cached in [('no FAQ / no cache', False), ('FAQ + reply cache', True)]:
+        latencies, calls = run(messages, cached)
+        print(f"{name:<22}{calls:>14}{np.percentile(latencies, 50):>9.2f}"
+              f"{np.percentile(latencies, 95):>9.2f}{latencies.sum() / 1e3:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
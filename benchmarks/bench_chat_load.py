@@ -0,0 +1,130 @@
+# bench_chat_load.py - Prediction latency while chat users are active, blocking vs background chat
+#
+# Run from the repo root:  python -m benchmarks.bench_chat_load
+# Starts gunicorn (sync workers) with the offline fake chat backend, keeps
+# CHAT_USERS chat conversations going and meanwhile scores patients through
+# /api/v1/predict, once with chat answered in the request and once with chat
+# queued as background jobs. The reply cache is off so every message reaches
+# the backend.
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.common import load_records
+
+WORKERS = 2
+CHAT_USERS = 4
+TOKEN_DELAY = 0.05          # ~1.3 s per fake reply
+DURATION = 8                # seconds of mixed traffic
+MODEL = 'models/alzheimer_lr_model.npz'
+
+CHAT_OUTPUT = '..chat-history.children...user-msg.value...chat-session.data..'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def chat_body(message):
+    """The request dash-renderer sends when the chat send button is clicked."""
+    return {
+        'output': CHAT_OUTPUT,
+        'outputs': [{'id': 'chat-history', 'property': 'children'},
+                    {'id': 'user-msg', 'property': 'value'},
+                    {'id': 'chat-session', 'property': 'data'}],
+        'inputs': [{'id': 'send-msg', 'property': 'n_clicks', 'value': 1},
+                   {'id': 'user-msg', 'property': 'n_submit', 'value': 0}],
+        'changedPropIds': ['send-msg.n_clicks'],
+        'state': [{'id': 'user-msg', 'property': 'value', 'value': message},
+                  {'id': 'chat-session', 'property': 'data', 'value': None},
+                  [], []]
+    }
+
+
+def chat_once(base, message, interval=0.25):
+    """Send one message and, for background jobs, poll like the browser until the reply is in."""
+    url = f'{base}/_dash-update-component'
+    response = requests.post(url, json=chat_body(message), timeout=60).json()
+    while 'cacheKey' in response:
+        time.sleep(interval)
+        r = requests.post(f"{url}?cacheKey={response['cacheKey']}&job={response['job']}",
+                          json=chat_body(message), timeout=60)
+        if r.status_code == 200 and 'response' in r.json():
+            return
+
+
+def run(chat_job_dir):
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, MODEL_FILE=MODEL, CHAT_BACKEND='fake',
+               CHAT_FAKE_TOKEN_DELAY=str(TOKEN_DELAY), CHAT_JOB_DIR=chat_job_dir,
+               MODEL_WATCH_INTERVAL='0', CHAT_CACHE_SIZE='0')
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:server', '-w', str(WORKERS),
+           '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', '--timeout', '120']
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        deadline = time.time() + 120
+        while True:
+            try:
+                requests.get(f'{base}/_pages/home', timeout=2)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline:
+                    raise RuntimeError('gunicorn did not come up')
+                time.sleep(0.5)
+
+        stop = time.time() + DURATION
+        replies = []
+
+        def chat_user(i):
+            while time.time() < stop:
+                start = time.perf_counter()
+                chat_once(base, f'What is MMSE? ({i})')
+                replies.append(time.perf_counter() - start)
+
+        users = [threading.Thread(target=chat_user, args=(i,)) for i in range(CHAT_USERS)]
+        for t in users:
+            t.start()
+
+        records = load_records(200)
+        latencies = []
+        i = 0
+        while time.time() < stop:
+            start = time.perf_counter()
+            requests.post(f'{base}/api/v1/predict', json=records[i % len(records)], timeout=60)
+            latencies.append((time.perf_counter() - start) * 1e3)
+            i += 1
+
+        for t in users:
+            t.join()
+        return np.array(latencies), np.array(replies)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    print(f"{WORKERS} sync workers, {CHAT_USERS} chat users, {DURATION}s of traffic\n")
+    print(f"{'chat mode':<12}{'predictions':>12}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+          f"{'replies':>9}{'reply s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, job_dir in [('blocking', ''), ('background', os.path.join(tmp, 'jobs'))]:
+            latencies, replies = run(job_dir)
+            print(f"{mode:<12}{len(latencies):>12}{np.percentile(latencies, 50):>9.1f}"
+                  f"{np.percentile(latencies, 95):>9.1f}{latencies.max():>9.1f}"
+                  f"{len(replies):>9}{np.median(replies):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# bench_chat_payload.py - Chat request/response bytes per turn as a conversation grows
+#
+# Run from the repo root:  python -m benchmarks.bench_chat_payload
+# Drives the real chat callback (answered in-request, fake backend) and
+# compares it with the previous protocol, where the whole chat-history
+# component tree went up as State and came back as the output.
+
+import os
+
+os.environ.setdefault('CHAT_BACKEND', 'fake')
+os.environ.setdefault('CHAT_FAKE_TOKEN_DELAY', '0')
+os.environ['CHAT_JOB_DIR'] = ''
+
+import json
+
+from plotly.io.json import to_json_plotly
+
+from Utils.components import create_ai_bubble, create_user_bubble
+from app import app
+
+TURNS = 40
+REPORT_AT = [1, 10, 20, 40]
+CHAT_OUTPUT = '..chat-history.children...user-msg.value...chat-session.data..'
+
+
+def chat_body(message, session_id):
+    return {
+        'output': CHAT_OUTPUT,
+        'outputs': [{'id': 'chat-history', 'property': 'children'},
+                    {'id': 'user-msg', 'property': 'value'},
+                    {'id': 'chat-session', 'property': 'data'}],
+        'inputs': [{'id': 'send-msg', 'property': 'n_clicks', 'value': 1},
+                   {'id': 'user-msg', 'property': 'n_submit', 'value': 0}],
+        'changedPropIds': ['send-msg.n_clicks'],
+        'state': [{'id': 'user-msg', 'property': 'value', 'value': message},
+                  {'id': 'chat-session', 'property': 'data', 'value': session_id},
+                  [], []]
+    }
+
+
+def main():
+    client = app.server.test_client()
+    session_id = None
+    history = []
+
+    print(f"{'turn':>5}{'old request B':>15}{'old response B':>16}{'new request B':>15}{'new response B':>16}")
+    for turn in range(1, TURNS + 1):
+        message = f"Question number {turn}: how does sleep affect memory?"
+        body = chat_body(message, session_id)
+        response = client.post('/_dash-update-component', json=body)
+        session_id = response.get_json()['response']['chat-session']['data']
+        reply = response.get_json()['response']['chat-history']['children']
+
+        # Previous protocol: the full history travels both ways on every turn
+        reply_text = reply['operations'][0]['params']['value'][1]['props']['children'][0]['props']['children'][1]['props']['children']
+        old_request = len(json.dumps(body)) + len(to_json_plotly(history))
+        history = history + [create_user_bubble(message), create_ai_bubble(reply_text)]
+        old_response = len(to_json_plotly({'multi': True, 'response': {'chat-history': {'children': history},
+                                                                'user-msg': {'value': ''}}}))
+
+        if turn in REPORT_AT:
+            print(f"{turn:>5}{old_request:>15}{old_response:>16}"
+                  f"{len(json.dumps(body)):>15}{len(response.data):>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# bench_cold_start.py - Time from interpreter start to the first served home page
+#
+# Run from the repo root:  python -m benchmarks.bench_cold_start
+# Each mode runs in a fresh interpreter, like a newly forked gunicorn worker.
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import BENCH_MODEL_FILE
+
+MODES = ['eager', 'lazy', 'background']
+RUNS = 3
+
+CHILD = r"""
+import json, time
+start = time.perf_counter()
+from app import server
+client = server.test_client()
+client.get('/')
+client.get('/_dash-layout')
+client.post('/_dash-update-component', json={
+    'output': 'page-content.children',
+    'outputs': {'id': 'page-content', 'property': 'children'},
+    'inputs': [{'id': 'url', 'property': 'pathname', 'value': '/'}],
+    'changedPropIds': ['url.pathname'], 'state': [],
+})
+print(json.dumps({'first_response_s': time.perf_counter() - start}))
+"""
+
+
+def run(mode):
+    env = dict(os.environ, MODEL_LOAD_MODE=mode, MODEL_FILE=BENCH_MODEL_FILE)
+    out = subprocess.run([sys.executable, '-c', CHILD], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])['first_response_s']
+
+
+def main():
+    print(f"{'mode':<12} {'first response (s)':>20}")
+    for mode in MODES:
+        best = min(run(mode) for _ in range(RUNS))
+        print(f"{mode:<12} {best:>20.2f}")
+
+
+if __name__ == '__main__':
+    main()
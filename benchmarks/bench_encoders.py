@@ -0,0 +1,97 @@
+# bench_encoders.py - Categorical features through sklearn LabelEncoder calls vs compiled lookup tables
+#
+# Run from the repo root:  python -m benchmarks.bench_encoders
+# Fits a LabelEncoder on the str option values of every option field (as a
+# training bundle would), checks that the compiled lookups encode every
+# dataset row exactly like them and reject the same unknown values, then
+# times prepare_input and prepare_batch both ways.
+
+import time
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+from Utils.compiled_model import CompiledLinearModel
+from Utils.labels import OPTION_LABELS
+from Utils.model_handler import LoadedModel
+from benchmarks.common import FORM_FEATURES, best_of, load_records
+
+N_ROWS = 2_149
+N_CALLS = 5_000
+BATCH_ROWS = 100_000
+MODEL = 'models/alzheimer_lr_model.npz'
+
+
+def legacy_prepare_input(encoders, values, ids):
+    """The previous per-request path: one LabelEncoder.transform per categorical feature."""
+    input_data = {}
+    for val, id_obj in zip(values, ids):
+        name = id_obj['index']
+        if name in encoders:
+            input_data[name] = encoders[name].transform([str(val)])[0]
+        else:
+            input_data[name] = val
+    return input_data
+
+
+def check_parity(encoders, loaded, records, ids):
+    for record in records:
+        values = [record[name] for name in FORM_FEATURES]
+        expected = legacy_prepare_input(encoders, values, ids)
+        assert loaded.prepare_input(values, ids) == expected, record
+
+    for name, encoder in encoders.items():
+        column = [r[name] for r in records]
+        expected = encoder.transform(np.asarray(column).astype(str))
+        assert np.array_equal(loaded.encoders[name].encode_column(column), expected), name
+        assert np.array_equal(loaded.encoders[name].transform(np.asarray(column).astype(str)), expected), name
+        for bad in ['7', 'x', '']:
+            try:
+                encoder.transform([bad])
+            except ValueError:
+                pass
+            else:
+                continue
+            try:
+                loaded.encoders[name].encode(bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"{name}: {bad!r} accepted by the lookup only")
+
+
+def per_call_us(fn, args):
+    start = time.perf_counter()
+    for values in args:
+        fn(values)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main():
+    records = load_records(N_ROWS)
+    ids = [{'type': 'input-field', 'index': name} for name in FORM_FEATURES]
+    encoders = {name: LabelEncoder().fit([str(v) for v in mapping]) for name, mapping in OPTION_LABELS.items()}
+
+    compiled = CompiledLinearModel.load(MODEL)
+    loaded = LoadedModel(compiled, compiled.feature_names, encoders, 'bench')
+    check_parity(encoders, loaded, records, ids)
+    print(f"✓ {len(encoders)} encoders, {N_ROWS:,} rows: lookups match LabelEncoder.transform")
+
+    forms = [[record[name] for name in FORM_FEATURES] for record in load_records(N_CALLS)]
+    legacy_us = per_call_us(lambda values: legacy_prepare_input(encoders, values, ids), forms)
+    lookup_us = per_call_us(lambda values: loaded.prepare_input(values, ids), forms)
+    print(f"\nprepare_input ({len(encoders)} categorical of {len(FORM_FEATURES)} fields), µs per call")
+    print(f"  LabelEncoder.transform   {legacy_us:9.1f}")
+    print(f"  compiled lookup          {lookup_us:9.1f}   ({legacy_us / lookup_us:.0f}x)")
+
+    batch = load_records(BATCH_ROWS)
+    columns = {name: [r[name] for r in batch] for name in encoders}
+    legacy_s = best_of(lambda: [encoders[name].transform(np.asarray(column).astype(str))
+                                for name, column in columns.items()])
+    lookup_s = best_of(lambda: [loaded.encoders[name].encode_column(column)
+                                for name, column in columns.items()])
+    print(f"\ncategorical columns of prepare_batch, {BATCH_ROWS:,} rows, seconds")
+    print(f"  LabelEncoder.transform   {legacy_s:9.3f}")
+    print(f"  compiled lookup          {lookup_s:9.3f}   ({legacy_s / lookup_s:.1f}x)")
+
+if __name__ == '__main__':
+    main()
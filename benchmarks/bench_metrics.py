@@ -0,0 +1,70 @@
+# bench_metrics.py - Per-call cost of the /metrics instrumentation
+#
+# Run from the repo root:  python -m benchmarks.bench_metrics
+# Times a no-op function bare and wrapped the way callbacks and model calls
+# are, the request middleware around a WSGI app that answers at once (the
+# Flask test client is too noisy to show a few microseconds), and rendering
+# /metrics once every series has data.
+
+import os
+
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+
+import time
+
+from Utils import metrics
+from Utils.model_handler import LoadedModel
+from benchmarks.common import BENCH_MODEL_FILE, load_records
+
+N_CALLS = 200_000
+
+
+def noop(*args):
+    return None
+
+
+def per_call_ns(fn, n=N_CALLS):
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter_ns() - start) / n)
+    return best
+
+
+def pong(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', '4')])
+    return [b'pong']
+
+
+def main():
+    timed = metrics.timed(metrics.model_seconds, 'bench', metrics.model_errors)(noop)
+    callback = metrics.instrument_callback(noop)
+
+    bare = per_call_ns(noop)
+    print(f"{'':<36}{'ns':>8}{'overhead ns':>13}")
+    print(f"{'no-op call':<36}{bare:>8.0f}")
+    for name, fn in [('timed (model calls)', timed), ('instrument_callback', callback)]:
+        ns = per_call_ns(fn)
+        print(f"{name:<36}{ns:>8.0f}{ns - bare:>13.0f}")
+    observe_ns = per_call_ns(lambda: metrics.callback_seconds.observe(0.003, 'bench'))
+    print(f"{'Histogram.observe':<36}{observe_ns:>8.0f}")
+
+    environ = {'CONTENT_LENGTH': '512'}
+    plain = per_call_ns(lambda: pong(environ, lambda *args: None))
+    wrapped_app = metrics._RequestMetrics(pong)
+    wrapped = per_call_ns(lambda: wrapped_app(environ, lambda *args: None))
+    print(f"{'WSGI request':<36}{plain:>8.0f}")
+    print(f"{'WSGI request + metrics middleware':<36}{wrapped:>8.0f}{wrapped - plain:>13.0f}")
+
+    model = LoadedModel.from_file(BENCH_MODEL_FILE)
+    for record in load_records(1_000):
+        model.predict(record)
+    lines = metrics.registry.render().count('\n')
+    render_us = per_call_ns(metrics.registry.render, 1_000) / 1e3
+    print(f"render /metrics ({lines} lines): {render_us:.0f} µs")
+
+
+if __name__ == '__main__':
+    main()
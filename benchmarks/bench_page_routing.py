@@ -0,0 +1,79 @@
+# bench_page_routing.py - Server cost of page navigation, server-side vs clientside routing
+#
+# Run from the repo root:  python -m benchmarks.bench_page_routing
+
+import time
+
+import dash
+import numpy as np
+from dash import Input, Output, dcc, html
+
+import Utils.pages as pages
+from app import app
+
+N_CALLS = 300
+PATHS = ['/', '/assessment', '/tips']
+
+# A browsing session: page visits plus mobile menu taps
+SESSION = ['/', '/assessment', '/tips', '/assessment', '/', '/assessment'] * 3
+NAVBAR_TOGGLES = 6
+
+
+def legacy_app():
+    """The original server-side routing callback, rebuilding each layout per request."""
+    legacy = dash.Dash(__name__, suppress_callback_exceptions=True)
+    legacy.layout = html.Div([dcc.Location(id='url'), html.Div(id='page-content')])
+
+    @legacy.callback(Output('page-content', 'children'), Input('url', 'pathname'))
+    def display_page(pathname):
+        name = (pathname or '/').strip('/')
+        return pages.PAGES.get(name, pages.create_home_page).__wrapped__()
+
+    return legacy
+
+
+def routing_body(pathname):
+    """The request dash-renderer sends when dcc.Location changes."""
+    return {
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [{'id': 'url', 'property': 'pathname', 'value': pathname}],
+        'changedPropIds': ['url.pathname'],
+        'state': []
+    }
+
+
+def timed(request, n_calls=N_CALLS):
+    """Return (latencies in ms, last response)."""
+    out = np.empty(n_calls)
+    for i in range(n_calls):
+        start = time.perf_counter_ns()
+        response = request()
+        out[i] = (time.perf_counter_ns() - start) / 1e6
+    return out, response
+
+
+def main():
+    legacy = legacy_app().server.test_client()
+    client = app.server.test_client()
+
+    print(f"{'page':<14}{'server callback':>22}{'GET /_pages':>22}{'304 revalidate':>18}")
+    for path in PATHS:
+        name = path.strip('/') or 'home'
+        slow, slow_response = timed(lambda: legacy.post('/_dash-update-component', json=routing_body(path)))
+        fast, fast_response = timed(lambda: client.get(f'/_pages/{name}'))
+        etag = fast_response.headers['ETag']
+        revalidate, _ = timed(lambda: client.get(f'/_pages/{name}', headers={'If-None-Match': etag}))
+        print(f"{path:<14}{np.median(slow):>9.2f} ms {len(slow_response.data):>7} B"
+              f"{np.median(fast):>9.2f} ms {len(fast_response.data):>7} B"
+              f"{np.median(revalidate):>9.2f} ms    0 B")
+
+    # Clientside, each page is fetched once per browser session and the navbar never calls home
+    before = len(SESSION) + NAVBAR_TOGGLES
+    after = len(set(SESSION))
+    print(f"\nSession of {len(SESSION)} navigations + {NAVBAR_TOGGLES} navbar toggles: "
+          f"{before} server requests before, {after} after ({1 - after / before:.0%} fewer)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# bench_parallel_scoring.py - Speedup of ParallelScorer at 1/2/4/8 processes
+#
+# Run from the repo root:  python -m benchmarks.bench_parallel_scoring [ROWS]
+# The dataset is replicated to ROWS rows (default 4M) and encoded once;
+# timings cover only scoring through the shared-memory pool.
+
+import os
+import sys
+
+from Utils.model_handler import ModelHandler
+from Utils.parallel_scoring import ParallelScorer
+from benchmarks.common import BENCH_MODEL_FILE, best_of, load_records
+
+PROCESSES = [1, 2, 4, 8]
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+    handler = ModelHandler(BENCH_MODEL_FILE)
+    base = handler.prepare_batch(load_records(min(n_rows, 100_000)))
+    X = base[[i % len(base) for i in range(n_rows)]]
+
+    print(f"{n_rows:,} rows, {os.cpu_count()} CPU(s) available")
+    print(f"{'processes':>9} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+    baseline = None
+    for n in PROCESSES:
+        with ParallelScorer(BENCH_MODEL_FILE, processes=n) as scorer:
+            scorer.score(X[:n * 10])  # warm up: spawn workers, load the model
+            shm, shared_X = scorer.shared_input(n_rows)
+            shared_X[:] = X
+            seconds = best_of(lambda: scorer.score(shared_X, shm), repeat=3)
+            del shared_X
+            shm.close()
+            shm.unlink()
+        baseline = baseline or seconds
+        print(f"{n:>9} {seconds:>9.2f} {n_rows / seconds:>12,.0f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# bench_preprocessing.py - Loading the training matrix: standardized CSV vs the float32 .npy store
+#
+# Run from the repo root:  python -m benchmarks.bench_preprocessing
+# "CSV" is the previous data/processed_alzheimers_data.csv, regenerated in a
+# temporary directory from the same raw data (the store now keeps the raw
+# features, so it is checked against the raw CSV instead). Also times a
+# preprocessing run that finds the raw file unchanged (hash check only)
+# against a full rebuild.
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config import RAW_DATA_FILE
+from Utils.preprocessing import build, load_processed, prepare
+from benchmarks.common import best_of
+
+
+def legacy_csv(path):
+    """The old processed CSV: z-scored float64 features plus the target, as text."""
+    raw = pd.read_csv(RAW_DATA_FILE).drop(columns=['PatientID', 'DoctorInCharge'])
+    features = raw.drop(columns=['Diagnosis'])
+    processed = (features - features.mean()) / features.std(ddof=0)
+    processed['Diagnosis'] = raw['Diagnosis']
+    processed.to_csv(path, index=False)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'processed.csv')
+        store = os.path.join(directory, 'processed')
+        legacy_csv(csv_path)
+        prepare(RAW_DATA_FILE, store)
+
+        X, y, meta = load_processed(store)
+        raw = pd.read_csv(RAW_DATA_FILE)
+        assert np.allclose(X, raw[meta['features']].to_numpy(), rtol=1e-6, atol=0)
+        assert np.array_equal(y, raw['Diagnosis'].to_numpy())
+
+        csv_bytes = os.path.getsize(csv_path)
+        npy_bytes = sum(os.path.getsize(os.path.join(store, name)) for name in os.listdir(store))
+        csv_s = best_of(lambda: pd.read_csv(csv_path))
+        mmap_s = best_of(lambda: load_processed(store))
+        # Touch every page, as training does
+        full_s = best_of(lambda: np.asarray(load_processed(store)[0]).sum())
+
+        print(f"{meta['n_rows']:,} rows x {len(meta['features'])} features\n")
+        print(f"{'load':<28}{'ms':>9}{'bytes':>12}")
+        print(f"{'CSV parse':<28}{csv_s * 1e3:>9.2f}{csv_bytes:>12,}")
+        print(f"{'npy memory map':<28}{mmap_s * 1e3:>9.2f}{npy_bytes:>12,}")
+        print(f"{'npy memory map, read all':<28}{full_s * 1e3:>9.2f}")
+
+        check_s = best_of(lambda: prepare(RAW_DATA_FILE, store))
+        rebuild_s = best_of(lambda: build(RAW_DATA_FILE, store))
+        print(f"\npreprocessing, raw data unchanged   {check_s * 1e3:8.2f} ms")
+        print(f"preprocessing, full rebuild         {rebuild_s * 1e3:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# bench_report_download.py - Report download: base64 in the callback vs a cached file URL
+#
+# Run from the repo root:  python -m benchmarks.bench_report_download
+# Drives the download callback through the Flask test client (answered in the
+# request, so timings are pure server time) and fetches the returned URL.
+# "inline base64" is the previous callback, which rendered the PDF and sent it
+# through dcc.send_bytes in the callback response.
+
+import os
+
+os.environ['CHAT_JOB_DIR'] = ''
+os.environ.setdefault('MODEL_LOAD_MODE', 'eager')
+os.environ.setdefault('MODEL_FILE', 'models/alzheimer_lr_model.npz')
+
+import tempfile
+import time
+
+import dash
+import numpy as np
+from dash import ALL, Input, Output, State, dcc, html
+
+from Utils.labels import get_readable_data
+from Utils.model_handler import model_handler
+from Utils.report_generator import generate_report
+from Utils import report_service
+from Utils.cache import create_cache
+from app import app
+from benchmarks.common import FORM_FEATURES, load_records
+
+N_PATIENTS = 200
+
+
+def download_body(record, n_clicks=1):
+    """The request dash-renderer sends when the download button is clicked."""
+    ids = [{'type': 'input-field', 'index': name} for name in FORM_FEATURES]
+    return {
+        'output': 'report-download.data',
+        'outputs': {'id': 'report-download', 'property': 'data'},
+        'inputs': [{'id': 'btn-download-pdf', 'property': 'n_clicks', 'value': n_clicks}],
+        'changedPropIds': ['btn-download-pdf.n_clicks'],
+        'state': [[{'id': i, 'property': 'value', 'value': record[i['index']]} for i in ids],
+                  [{'id': i, 'property': 'id', 'value': i} for i in ids]],
+    }
+
+
+def legacy_app():
+    """A Dash app with only the previous download callback."""
+    legacy = dash.Dash(__name__, suppress_callback_exceptions=True)
+    legacy.layout = html.Div([html.Button(id="btn-download-pdf"), dcc.Download(id="download-pdf-component")])
+
+    @legacy.callback(
+        Output("download-pdf-component", "data"),
+        Input("btn-download-pdf", "n_clicks"),
+        State({'type': 'input-field', 'index': ALL}, 'value'),
+        State({'type': 'input-field', 'index': ALL}, 'id'),
+        prevent_initial_call=True
+    )
+    def download_report(n_clicks, values, ids):
+        active = model_handler.active()
+        input_data = active.prepare_input(values, ids)
+        result = model_handler.predict(input_data, active)
+        pdf_bytes = generate_report(get_readable_data(input_data), result)
+        return dcc.send_bytes(pdf_bytes, filename="neuropredict_report.pdf")
+
+    return legacy
+
+
+def inline_base64(client, record):
+    """Callback only; returns (callback bytes, 0)."""
+    body = download_body(record)
+    body['output'] = 'download-pdf-component.data'
+    body['outputs'] = {'id': 'download-pdf-component', 'property': 'data'}
+    return len(client.post('/_dash-update-component', json=body).data), 0
+
+
+def url_download(client, record, n_clicks):
+    """Callback plus file GET; returns (callback bytes, file bytes)."""
+    response = client.post('/_dash-update-component', json=download_body(record, n_clicks))
+    url = response.get_json()['response']['report-download']['data']['url']
+    pdf = client.get(url)
+    assert pdf.status_code == 200 and pdf.data.startswith(b'%PDF')
+    return len(response.data), len(pdf.data)
+
+
+def timed(fn, records):
+    latencies, sizes = [], None
+    for record in records:
+        start = time.perf_counter()
+        sizes = fn(record)
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return np.array(latencies), sizes
+
+
+def main():
+    records = load_records(N_PATIENTS)
+    client = app.server.test_client()
+    legacy_client = legacy_app().server.test_client()
+    with tempfile.TemporaryDirectory() as directory:
+        report_service._store = create_cache(directory, 4096, 3600)
+        clicks = iter(range(1, 10 ** 6))
+        rows = [
+            ('inline base64', lambda r: inline_base64(legacy_client, r)),
+            ('URL, first download', lambda r: url_download(client, r, next(clicks))),
+            ('URL, repeat download', lambda r: url_download(client, r, next(clicks))),
+        ]
+        print(f"{N_PATIENTS} patients, one click each\n")
+        print(f"{'path':<22}{'p50 ms':>8}{'p95 ms':>8}{'callback B':>12}{'file B':>8}")
+        for name, fn in rows:
+            latencies, (callback_bytes, file_bytes) = timed(fn, records)
+            print(f"{name:<22}{np.percentile(latencies, 50):>8.2f}{np.percentile(latencies, 95):>8.2f}"
+                  f"{callback_bytes:>12,}{file_bytes:>8,}")
+
+
+if __name__ == '__main__':
+    main()
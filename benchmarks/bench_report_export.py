@@ -0,0 +1,75 @@
+# bench_report_export.py - Bulk report export: throughput and peak memory vs patient count
+#
+# Run from the repo root:  python -m benchmarks.bench_report_export
+# Streams a multi-page PDF and a ZIP of per-patient PDFs to a temporary file.
+# Patients are generated lazily, so the traced peak is the exporter's own
+# working memory; "bytes(pdf.output())" is the previous approach of laying
+# every page out in one PDFReport and holding the whole file in memory.
+
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import cycle, islice
+
+from Utils.labels import get_readable_data
+from Utils.report_generator import PDFReport, render_report, write_reports_pdf, write_reports_zip
+from benchmarks.common import load_records
+
+SIZES = [1_000, 10_000, 50_000]
+# The in-memory layout path is slow and its memory grows; stop it earlier
+IN_MEMORY_MAX = 10_000
+
+
+def patients(base, n):
+    for i, record in enumerate(islice(cycle(base), n)):
+        probability = (i * 37 % 1000) / 1000
+        yield get_readable_data(record), {'is_positive': probability > 0.5, 'probability': probability}
+
+
+def in_memory_pdf(items, fileobj):
+    pdf = PDFReport()
+    date = datetime.now().strftime("%Y-%m-%d %H:%M")
+    for input_data, result in items:
+        render_report(pdf, input_data, result, date)
+    fileobj.write(bytes(pdf.output()))
+
+
+def measure(export, items):
+    """(seconds, peak traced MB) for export(items, file)."""
+    with tempfile.TemporaryFile() as sink:
+        tracemalloc.start()
+        start = time.perf_counter()
+        export(items, sink)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def main():
+    base = load_records(1_000)
+    exporters = {
+        'bytes(pdf.output())': in_memory_pdf,
+        'streamed PDF': write_reports_pdf,
+        'streamed ZIP': write_reports_zip,
+    }
+    # Warm the template cache so the first row is not charged for it
+    write_reports_pdf(patients(base, 200), open(os.devnull, 'wb'))
+
+    print("reports/s and peak traced memory (tracemalloc slows every path alike)")
+    print(f"{'patients':>9}" + "".join(f"{name:>26}" for name in exporters))
+    for n in SIZES:
+        row = f"{n:>9,}"
+        for name, export in exporters.items():
+            if export is in_memory_pdf and n > IN_MEMORY_MAX:
+                row += f"{'-':>26}"
+                continue
+            seconds, peak_mb = measure(export, patients(base, n))
+            row += f"{n / seconds:>14,.0f}/s {peak_mb:>7.1f} MB"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# bench_report_generation.py - PDF reports/sec: full fpdf2 layout vs cached templates
+#
+# Run from the repo root:  python -m benchmarks.bench_report_generation [WORKERS]
+# "layout" builds a fresh PDFReport per report (the previous generate_report);
+# "template" is the current generate_report; "batch" is generate_reports over
+# a process pool of WORKERS processes (default: all cores).
+
+import os
+import sys
+import time
+from datetime import datetime
+
+from Utils.labels import get_readable_data
+from Utils.report_generator import PDFReport, generate_report, generate_reports, render_report
+from benchmarks.common import load_records
+
+SIZES = [1, 100, 10_000]
+
+
+def layout_report(input_data, result):
+    pdf = PDFReport()
+    render_report(pdf, input_data, result, datetime.now().strftime("%Y-%m-%d %H:%M"))
+    return bytes(pdf.output())
+
+
+def workload(n):
+    """(readable form, result) pairs with a spread of probabilities."""
+    items = []
+    for i, record in enumerate(load_records(n)):
+        probability = (i * 37 % 1000) / 1000
+        items.append((get_readable_data(record), {'is_positive': probability > 0.5,
+                                                  'probability': probability}))
+    return items
+
+
+def rate(fn, items):
+    start = time.perf_counter()
+    fn(items)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    runners = {
+        'layout': lambda items: [layout_report(*item) for item in items],
+        'template': lambda items: [generate_report(*item) for item in items],
+        f'batch x{workers}': lambda items: list(generate_reports(items, workers=workers)),
+    }
+
+    print(f"{os.cpu_count()} CPU(s) available; reports/s (first report of a run pays for its template)")
+    print(f"{'reports':>8}" + "".join(f"{name:>14}" for name in runners))
+    for n in SIZES:
+        items = workload(n)
+        rates = [rate(fn, items) for fn in runners.values()]
+        print(f"{n:>8,}" + "".join(f"{r:>14,.0f}" for r in rates))
+
+
+if __name__ == '__main__':
+    main()
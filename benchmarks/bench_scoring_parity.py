@@ -0,0 +1,122 @@
+# bench_scoring_parity.py - The served model scores every dataset row identically on every path
+#
+# Run from the repo root:  python -m benchmarks.bench_scoring_parity
+# Scores all rows of the raw dataset with config.MODEL_FILE five ways and
+# requires the same predictions and bit-identical probabilities:
+#   offline  - the bundle's sklearn pipeline on the raw feature matrix, and
+#              Utils.bulk_scoring over the CSV
+#   UI       - the Dash prediction callback, one request per patient
+#   batch    - ModelHandler.predict_batch
+#   API      - POST /api/v1/predict with every row in one request
+# then times the sklearn pipeline against the scaler-folded TransformGraph.
+
+import os
+
+os.environ['CHAT_JOB_DIR'] = ''
+os.environ['MODEL_LOAD_MODE'] = 'eager'
+os.environ['PREDICTION_CACHE_SIZE'] = '0'
+
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config import MODEL_FILE
+from Utils.bulk_scoring import score_file
+from Utils.model_handler import model_handler
+from app import app
+from benchmarks.common import DATA_FILE, FORM_FEATURES, best_of, load_records
+
+
+def predict_body(record):
+    """The request dash-renderer sends when "Analyze Risk Profile" is clicked."""
+    ids = [{'type': 'input-field', 'index': name} for name in FORM_FEATURES]
+    return {
+        'output': '..prediction-output.children...result-store.data..',
+        'outputs': [{'id': 'prediction-output', 'property': 'children'},
+                    {'id': 'result-store', 'property': 'data'}],
+        'inputs': [{'id': 'predict-btn', 'property': 'n_clicks', 'value': 1}],
+        'changedPropIds': ['predict-btn.n_clicks'],
+        'state': [[{'id': i, 'property': 'value', 'value': record[i['index']]} for i in ids],
+                  [{'id': i, 'property': 'id', 'value': i} for i in ids]],
+    }
+
+
+def ui_scores(client, records):
+    predictions, probabilities = [], []
+    for record in records:
+        response = client.post('/_dash-update-component', json=predict_body(record))
+        result = response.get_json()['response']['result-store']['data']
+        predictions.append(result['prediction'])
+        probabilities.append(result['probability'])
+    return np.array(predictions), np.array(probabilities)
+
+
+def api_scores(client, records):
+    response = client.post('/api/v1/predict', json={'records': records})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    return np.array(body['predictions']), np.array(body['probabilities'])
+
+
+def bulk_scores(directory):
+    out = os.path.join(directory, 'scores.csv')
+    score_file(DATA_FILE, out)
+    scored = pd.read_csv(out, float_precision='round_trip')
+    return scored['prediction'].to_numpy(), scored['probability'].to_numpy()
+
+
+def main():
+    active = model_handler.active()
+    raw = pd.read_csv(DATA_FILE)
+    records = load_records(len(raw))
+    X = raw.reindex(columns=active.feature_names, fill_value=0).to_numpy(dtype=np.float64)
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        proba = active.model.predict_proba(X)
+    reference = (active.model.classes_[proba.argmax(axis=1)], proba[:, 1])
+
+    client = app.server.test_client()
+    batch = active.predict_batch(records)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            'offline, bulk_scoring': bulk_scores(directory),
+            'UI callback': ui_scores(client, records),
+            'predict_batch': (batch['prediction'], batch['probability']),
+            'API batch': api_scores(client, records),
+        }
+
+    print(f"{MODEL_FILE} ({active.version}), {len(raw):,} rows, reference: sklearn pipeline\n")
+    print(f"{'path':<24}{'predictions':>13}{'max |dp|':>11}")
+    for name, (predictions, probabilities) in paths.items():
+        agree = int(np.sum(predictions == reference[0]))
+        diff = float(np.abs(probabilities - reference[1]).max())
+        print(f"{name:<24}{agree:>8,}/{len(raw):,}{diff:>11.1e}")
+        assert agree == len(raw) and diff == 0.0, name
+    print("✓ Identical on every path")
+
+    graph = active.graph
+    if active.compiled is None:
+        row = X[:1]
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            pipeline_row = best_of(lambda: [active.model.predict_proba(row) for _ in range(200)]) / 200
+            pipeline_all = best_of(lambda: active.model.predict_proba(X))
+        graph_row = best_of(lambda: [graph.predict_proba(row) for _ in range(200)]) / 200
+        graph_all = best_of(lambda: graph.predict_proba(X))
+        print(f"\n{'':<24}{'1 row ms':>10}{f'{len(raw):,} rows ms':>16}")
+        print(f"{'sklearn pipeline':<24}{pipeline_row * 1e3:>10.3f}{pipeline_all * 1e3:>16.2f}")
+        print(f"{'transform graph':<24}{graph_row * 1e3:>10.3f}{graph_all * 1e3:>16.2f}")
+        scale_us = best_of(lambda: [graph.transform(row) for _ in range(1000)]) / 1000 * 1e6
+        print(f"\nscaling 1 row: affine pass {scale_us:.1f} µs", end='')
+        scaler = getattr(active.model, 'named_steps', {}).get('scaler')
+        if scaler is not None:
+            scaler_us = best_of(lambda: [scaler.transform(row) for _ in range(1000)]) / 1000 * 1e6
+            print(f", StandardScaler.transform {scaler_us:.1f} µs", end='')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# bench_single_predict.py - p50/p99 latency of a single interactive prediction
+#
+# Run from the repo root:  python -m benchmarks.bench_single_predict
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from Utils.model_handler import ModelHandler
+from benchmarks.common import BENCH_MODEL_FILE, load_records
+
+N_CALLS = 5_000
+
+
+def legacy_predict(handler, input_data):
+    """The original DataFrame + reindex path, kept here as the baseline."""
+    df = pd.DataFrame([input_data]).reindex(columns=handler.feature_names, fill_value=0)
+    prediction = handler.model.predict(df)[0]
+    probability = handler.model.predict_proba(df)[0][1]
+    return {'prediction': int(prediction), 'probability': float(probability)}
+
+
+def latencies(fn, records):
+    """Per-call latencies in microseconds."""
+    out = np.empty(len(records))
+    for i, record in enumerate(records):
+        start = time.perf_counter_ns()
+        fn(record)
+        out[i] = (time.perf_counter_ns() - start) / 1e3
+    return out
+
+
+def main():
+    handler = ModelHandler(BENCH_MODEL_FILE)
+    records = load_records(N_CALLS)
+
+    active = handler.active()
+    compiled, active.compiled = active.compiled, None
+    ndarray_path = latencies(handler.predict, records)
+    active.compiled = compiled
+
+    paths = {
+        'DataFrame (legacy)': latencies(lambda r: legacy_predict(handler, r), records),
+        'ndarray estimator': ndarray_path,
+        'linear fast path': latencies(handler.predict, records),
+    }
+
+    print(f"{'path':<20} {'p50 us':>10} {'p99 us':>10}")
+    for name, lat in paths.items():
+        print(f"{name:<20} {np.percentile(lat, 50):>10.1f} {np.percentile(lat, 99):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
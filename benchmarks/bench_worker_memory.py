@@ -0,0 +1,95 @@
+# bench_worker_memory.py - Per-worker RSS/PSS of gunicorn with 1, 4 and 16 workers
+#
+# Run from the repo root:  python -m benchmarks.bench_worker_memory
+# Compares each worker loading its own pickle against a preloaded master,
+# with the pickle and with a memory-mapped compiled model directory.
+# PSS splits shared pages between the processes that map them, so it is
+# the fair per-worker cost; RSS counts shared pages in full.
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from Utils.compiled_model import export
+from benchmarks.common import BENCH_MODEL_FILE
+
+WORKER_COUNTS = [1, 4, 16]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid):
+    """Rss, Pss and private memory of a process in MiB."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return fields['Rss'], fields['Pss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def measure(n_workers, model_file, preload, empty_conf):
+    port = free_port()
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:server', '-w', str(n_workers),
+           '--bind', f'127.0.0.1:{port}', '--log-level', 'warning']
+    cmd += ['--preload'] if preload else ['-c', empty_conf]
+    env = dict(os.environ, MODEL_FILE=model_file, MODEL_LOAD_MODE='eager')
+
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 300
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+                if len(worker_pids(proc.pid)) == n_workers:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError('gunicorn did not come up')
+            time.sleep(0.5)
+        # Let the remaining workers finish importing the app
+        time.sleep(2 + n_workers)
+
+        stats = [smaps(pid) for pid in worker_pids(proc.pid)]
+        return [sum(col) / len(stats) for col in zip(*stats)]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        mmap_dir = os.path.join(tmp, 'model')
+        export(BENCH_MODEL_FILE, mmap_dir)
+        empty_conf = os.path.join(tmp, 'empty.conf.py')
+        open(empty_conf, 'w').close()
+
+        setups = [
+            ('pickle, per-worker load', BENCH_MODEL_FILE, False),
+            ('pickle, --preload', BENCH_MODEL_FILE, True),
+            ('mmap dir, --preload', mmap_dir, True),
+        ]
+        print(f"{'setup':<26} {'workers':>7} {'RSS MiB':>9} {'PSS MiB':>9} {'private MiB':>12}")
+        for name, model_file, preload in setups:
+            for n in WORKER_COUNTS:
+                rss, pss, private = measure(n, model_file, preload, empty_conf)
+                print(f"{name:<26} {n:>7} {rss:>9.1f} {pss:>9.1f} {private:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# common.py - Shared workload and timing helpers for the benchmark scripts
+
+import time
+
+import numpy as np
+import pandas as pd
+from config import FEATURE_GROUPS
+
+DATA_FILE = 'data/alzheimers_disease_data.csv'
+BENCH_MODEL_FILE = 'models/alzheimer_lr_model.pkl'
+
+FORM_FEATURES = [f['name'] for group in FEATURE_GROUPS.values() for f in group['features']]
+
+
+def load_records(n_rows):
+    """Replicate the raw dataset to n_rows form-style records (feature dicts)."""
+    df = pd.read_csv(DATA_FILE, usecols=FORM_FEATURES)
+    reps = -(-n_rows // len(df))
+    df = pd.concat([df] * reps, ignore_index=True).iloc[:n_rows]
+    return df.to_dict('records')
+
+
+def synthetic_records(n_rows, seed=0):
+    """n_rows form-style records resampled from the raw dataset, identical for a given seed."""
+    df = pd.read_csv(DATA_FILE, usecols=FORM_FEATURES)
+    rows = np.random.default_rng(seed).integers(0, len(df), n_rows)
+    return df.iloc[rows].to_dict('records')
+
+
+def best_of(fn, repeat=3):
+    """Return the fastest wall-clock time of fn() over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,231 @@
+# suite.py - Every serving path timed in isolation on a fixed workload, results written as JSON
+#
+# Run from the repo root:
+#   python -m benchmarks.suite [--only predict,generate_report] [--quick] [--out FILE] [--compare OLD.json]
+#
+# The workload is WORKLOAD_ROWS patients resampled from the raw dataset with a
+# fixed seed, and every input a case needs (form values, encoded input,
+# prediction, readable labels) is prepared before it starts, so each case
+# times only its own path. Cases are warmed up, timed call by call
+# (throughput, p50/p95/p99 latency) and then run again under tracemalloc for
+# their peak traced memory, so tracing overhead never shows in the timings.
+# bulk_scoring.cli_workers2 times whole runs of the bulk scoring CLI with a
+# two-process pool on the raw dataset (its memory is the child's, not traced).
+# Results go to cache/benchmarks/<commit>.json unless --out says otherwise;
+# --compare prints the change against an earlier run.
+
+import os
+
+os.environ['CHAT_JOB_DIR'] = ''
+os.environ['MODEL_LOAD_MODE'] = 'eager'
+# Score every predict call instead of answering repeats from the cache
+os.environ['PREDICTION_CACHE_SIZE'] = '0'
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.common import DATA_FILE, FORM_FEATURES, synthetic_records
+
+WORKLOAD_ROWS = 2_000
+SEED = 20_240_601
+WARMUP_CALLS = 20
+MEMORY_CALLS = 200
+# Flag a case when its p50 latency grew by more than this fraction
+REGRESSION_THRESHOLD = 0.10
+# A bulk scoring run that takes longer than this is treated as hung
+BULK_TIMEOUT_S = 120
+
+
+def git_commit():
+    """Short HEAD hash, with '+dirty' for uncommitted changes to tracked files; None outside git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+dirty' if dirty else '')
+
+
+def uncached(fn):
+    """The builder behind an lru_cache, so every call does the real work."""
+    return getattr(fn, '__wrapped__', fn)
+
+
+def bulk_scoring_cli(workers, out_dir):
+    """
+    fn(i) running the bulk scoring CLI on the raw dataset with `workers`
+    processes, as a user would: a fresh interpreter with the default
+    MODEL_LOAD_MODE, so a pool that cannot start fails the run instead of hanging it.
+    """
+    env = {name: value for name, value in os.environ.items() if name != 'MODEL_LOAD_MODE'}
+    out = os.path.join(out_dir, 'scores.csv')
+
+    def run(i):
+        subprocess.run([sys.executable, '-m', 'Utils.bulk_scoring', DATA_FILE, out, '--workers', str(workers)],
+                       env=env, check=True, capture_output=True, timeout=BULK_TIMEOUT_S)
+
+    return run
+
+
+def build_cases(records, scratch_dir):
+    """[(name, calls, fn(i))] for every path, each fed the i-th workload patient."""
+    from app import app
+    from Utils import components, pages
+    from Utils.labels import get_readable_data
+    from Utils.model_handler import model_handler
+    from Utils.report_generator import generate_report
+
+    active = model_handler.active()
+    ids = [{'type': 'input-field', 'index': name} for name in FORM_FEATURES]
+    values = [[record[name] for name in FORM_FEATURES] for record in records]
+    inputs = [active.prepare_input(v, ids) for v in values]
+    results = [model_handler.predict(input_data, active) for input_data in inputs]
+    readable = [get_readable_data(input_data) for input_data in inputs]
+    client = app.server.test_client()
+
+    def roundtrip(i):
+        response = client.post('/_dash-update-component', json={
+            'output': '..prediction-output.children...result-store.data..',
+            'outputs': [{'id': 'prediction-output', 'property': 'children'},
+                        {'id': 'result-store', 'property': 'data'}],
+            'inputs': [{'id': 'predict-btn', 'property': 'n_clicks', 'value': i + 1}],
+            'changedPropIds': ['predict-btn.n_clicks'],
+            'state': [[{'id': id_obj, 'property': 'value', 'value': v} for id_obj, v in zip(ids, values[i])],
+                      [{'id': id_obj, 'property': 'id', 'value': id_obj} for id_obj in ids]],
+        })
+        assert response.status_code == 200, response.status_code
+
+    n = len(records)
+    home, assessment, tips = (uncached(f) for f in (pages.create_home_page, pages.create_assessment_page,
+                                                     pages.create_tips_page))
+    return [
+        ('prepare_input', 20_000, lambda i: active.prepare_input(values[i % n], ids)),
+        ('predict', 1_000, lambda i: model_handler.predict(inputs[i % n], active)),
+        ('get_readable_data', 20_000, lambda i: get_readable_data(inputs[i % n])),
+        ('generate_report', 2_000, lambda i: generate_report(readable[i % n], results[i % n])),
+        ('pages.create_navbar', 500, lambda i: pages.create_navbar()),
+        ('pages.create_home_page', 200, lambda i: home()),
+        ('pages.create_assessment_page', 200, lambda i: assessment()),
+        ('pages.create_tips_page', 200, lambda i: tips()),
+        ('components.create_result_card', 5_000, lambda i: components.create_result_card(results[i % n])),
+        ('components.create_error_alert', 5_000, lambda i: components.create_error_alert("Invalid value")),
+        ('components.get_all_feature_cards', 200, lambda i: components.get_all_feature_cards()),
+        ('components.create_chat_component', 1_000, lambda i: components.create_chat_component()),
+        ('dash.predict_roundtrip', 500, roundtrip),
+        ('bulk_scoring.cli_workers2', 3, bulk_scoring_cli(2, scratch_dir)),
+    ]
+
+
+def measure(fn, calls):
+    """Latency percentiles, throughput and peak traced memory for `calls` calls of fn(i)."""
+    for i in range(min(WARMUP_CALLS, calls)):
+        fn(i)
+
+    latencies = np.empty(calls)
+    start = time.perf_counter()
+    for i in range(calls):
+        t0 = time.perf_counter_ns()
+        fn(i)
+        latencies[i] = time.perf_counter_ns() - t0
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(min(calls, MEMORY_CALLS)):
+        fn(i)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) / 1e3
+    return {
+        'calls': calls,
+        'throughput_per_s': round(calls / elapsed, 1),
+        'mean_us': round(float(latencies.mean()) / 1e3, 2),
+        'p50_us': round(float(p50), 2),
+        'p95_us': round(float(p95), 2),
+        'p99_us': round(float(p99), 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(current, baseline_file):
+    """Print the change of every shared case against an earlier results file."""
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_file} ({baseline.get('commit')})")
+    print(f"{'case':<36}{'throughput':>12}{'p50':>9}{'p99':>9}{'peak mem':>10}")
+    for name, now in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+
+        def change(key):
+            return (now[key] - before[key]) / before[key] if before[key] else 0.0
+
+        flag = "  REGRESSION" if change('p50_us') > REGRESSION_THRESHOLD else ""
+        print(f"{name:<36}{change('throughput_per_s'):>+12.0%}{change('p50_us'):>+9.0%}"
+              f"{change('p99_us'):>+9.0%}{change('peak_memory_kb'):>+10.0%}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every serving path and write the results as JSON.")
+    parser.add_argument('--only', help="comma-separated case names or prefixes (e.g. predict,pages.)")
+    parser.add_argument('--quick', action='store_true', help="a tenth of the calls, for a smoke run")
+    parser.add_argument('--out', help="results file (default: cache/benchmarks/<commit>.json)")
+    parser.add_argument('--compare', metavar='OLD.json', help="print the change against an earlier run")
+    args = parser.parse_args()
+
+    from config import MODEL_FILE
+    from Utils.model_handler import model_handler
+
+    records = synthetic_records(WORKLOAD_ROWS, SEED)
+    scratch = tempfile.TemporaryDirectory()
+    cases = build_cases(records, scratch.name)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(',') if w.strip()]
+        cases = [case for case in cases if any(case[0].startswith(w) for w in wanted)]
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'model_file': MODEL_FILE,
+        'model_version': model_handler.version,
+        'workload': {'source': DATA_FILE, 'rows': WORKLOAD_ROWS, 'seed': SEED},
+        'results': {},
+    }
+
+    print(f"{'case':<36}{'calls':>7}{'per s':>11}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'peak KB':>10}")
+    for name, calls, fn in cases:
+        if args.quick:
+            calls = max(calls // 10, min(calls, 10))
+        stats = report['results'][name] = measure(fn, calls)
+        print(f"{name:<36}{stats['calls']:>7,}{stats['throughput_per_s']:>11,.0f}{stats['p50_us']:>10.1f}"
+              f"{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}{stats['peak_memory_kb']:>10.1f}")
+
+    out = args.out or os.path.join('cache', 'benchmarks', f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
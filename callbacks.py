@@ -1,108 +1,33 @@
+import uuid
+
 import dash
-from dash import Input, Output, State, ALL, dcc, html
-from Utils.chatbot_service import get_chat_response
-from Utils.report_generator import generate_report
-from config import FEATURE_GROUPS
+from dash import Input, Output, State, ALL, Patch, dcc, html
+from Utils.chat_history import prompt_history, record_turn
+from Utils.chatbot_service import ChatBackendError, stream_chat_response
+from Utils.metrics import instrument_callback
+from Utils.report_service import ensure_report, report_path
+from config import CHAT_POLL_INTERVAL, MODEL_READY_TIMEOUT
 from dash import html
 import dash_bootstrap_components as dbc
 
-def get_readable_data(input_data):
+def register_callbacks(app, background_manager=None):
     """
-    Converts model-friendly numeric data (0, 1) back to human-readable strings (Male, Female)
-    based on the 'options' defined in config.py.
+    Register all callbacks for the app. With a background_manager (a Dash
+    DiskcacheManager or CeleryManager) chat replies run as streamed background
+    jobs and PDF reports are prepared as background jobs.
+
+    Callbacks that run in the request are timed by instrument_callback
+    (Utils/metrics.py); background jobs run in their own processes, where
+    only the requests that start and poll them are measured.
     """
-    readable_data = input_data.copy()
-
-    # 1. Build a lookup dictionary from your config
-    # Structure will be: {'Gender': {0: 'Male', 1: 'Female'}, 'Smoking': {0: 'No', 1: 'Yes'}}
-    value_mappings = {}
-
-    for group in FEATURE_GROUPS.values():
-        for feature in group['features']:
-            # Only process features that have 'options' (Dropdowns/Radio buttons)
-            if 'options' in feature:
-                # Create a mini-dictionary for this feature mapping values to labels
-                feature_map = {opt['value']: opt['label'] for opt in feature['options']}
-                value_mappings[feature['name']] = feature_map
-
-    # 2. Apply mappings to the input data
-    for key, val in readable_data.items():
-        if key in value_mappings:
-            # Try to find the label for this value
-            # We handle potential type mismatches (string "0" vs integer 0)
-            try:
-                # Check for exact match or try converting to int
-                mapping = value_mappings[key]
-                if val in mapping:
-                    readable_data[key] = mapping[val]
-                elif int(val) in mapping:
-                    readable_data[key] = mapping[int(val)]
-            except (ValueError, TypeError):
-                # If conversion fails, keep original value
-                continue
-
-    return readable_data
-
-
-def register_callbacks(app):
-    """Register all callbacks for the app."""
 
     # Import here to avoid circular imports
     from Utils.model_handler import model_handler
-    from Utils.components import create_result_card, create_error_alert
-    from Utils.pages import create_home_page, create_tips_page
-
-    # Import assessment page creator from app module
-    def get_assessment_page():
-        from Utils.components import (
-            create_header, create_info_banner, create_predict_button,
-            create_footer, get_all_feature_cards
-        )
-
-        return html.Div([
-            dbc.Container([
-                create_header(),
-                create_info_banner(),
-                html.Div(get_all_feature_cards()),
-                create_predict_button(),
-                dbc.Row([
-                    dbc.Col([
-                        dbc.Spinner(
-                            html.Div(id="prediction-output"),
-                            color="primary",
-                            spinner_style={"width": "3rem", "height": "3rem"}
-                        )
-                    ], xs=12, md=10, lg=8, className="mx-auto")
-                ]),
-                create_footer()
-            ], fluid=True, style={"maxWidth": "1200px"})
-        ], style={"paddingBottom": "3rem"})
-
-    # --- Page Routing Callback ---
-    @app.callback(
-        Output("page-content", "children"),
-        Input("url", "pathname")
-    )
-    def display_page(pathname):
-        """Handle page routing based on URL."""
-        if pathname == "/assessment":
-            return get_assessment_page()
-        elif pathname == "/tips":
-            return create_tips_page()
-        else:  # Default to home page
-            return create_home_page()
-
-    # --- Navbar Toggle for Mobile ---
-    @app.callback(
-        Output("navbar-collapse", "is_open"),
-        Input("navbar-toggler", "n_clicks"),
-        State("navbar-collapse", "is_open"),
+    from Utils.components import (
+        create_result_card, create_error_alert, create_user_bubble, create_ai_bubble
     )
-    def toggle_navbar_collapse(n_clicks, is_open):
-        """Toggle navbar collapse on mobile."""
-        if n_clicks:
-            return not is_open
-        return is_open
+
+    # Page routing and the navbar toggle run in the browser (Utils/clientside.py)
 
     # --- Prediction Callback ---
     @app.callback(
@@ -113,20 +38,26 @@ def register_callbacks(app):
         State({'type': 'input-field', 'index': ALL}, 'id'),
         prevent_initial_call=True
     )
+    @instrument_callback
     def predict_disease(n_clicks, values, ids):
         """Handle prediction when button is clicked."""
 
         if not n_clicks:
             return dash.no_update, dash.no_update
 
-        if not model_handler.is_loaded():
-            return create_error_alert(
-                "Model file not found. Please ensure 'alzheimers_model_data.pkl' is in the directory."
-            ), None
+        if not model_handler.ensure_loaded(timeout=MODEL_READY_TIMEOUT):
+            if model_handler.status == 'loading':
+                return create_error_alert(
+                    "The prediction model is still loading. Please try again in a few seconds.",
+                    color="info"
+                ), None
+            return create_error_alert(f"Model unavailable. {model_handler.load_error}"), None
 
         try:
-            input_data = model_handler.prepare_input(values, ids)
-            result = model_handler.predict(input_data)
+            # Pin one model version for the whole request
+            active = model_handler.active()
+            input_data = active.prepare_input(values, ids)
+            result = model_handler.predict(input_data, active)
 
             return create_result_card(result), result
 
@@ -136,25 +67,49 @@ def register_callbacks(app):
             return create_error_alert(f"Prediction Error: {str(e)}", color="warning"), None
 
     # Download Report
-    @app.callback(
-        Output("download-pdf-component", "data"),
+    # The callback only hands back where the PDF can be fetched: scoring runs
+    # as a background job when a manager is available, and the browser then
+    # downloads the file straight from Flask, which renders it dated at that
+    # moment (Utils/report_service.py)
+    report_dependencies = (
+        Output("report-download", "data"),
         Input("btn-download-pdf", "n_clicks"),
-        State('result-store', 'data'),
         State({'type': 'input-field', 'index': ALL}, 'value'),
         State({'type': 'input-field', 'index': ALL}, 'id'),
-        prevent_initial_call=True
     )
-    def download_report(n_clicks, result, values, ids):
-        # 1. Prepare data for the MODEL (keep as numbers)
-        input_data = model_handler.prepare_input(values, ids)
-
-        # 2. Prepare data for the PDF REPORT (convert to strings)
-        report_data = get_readable_data(input_data)
-
-        # 3. Generate PDF using the readable data
-        pdf_bytes = generate_report(report_data, result)
 
-        return dcc.send_bytes(pdf_bytes, filename="neuropredict_report.pdf")
+    def prepare_report(n_clicks, values, ids):
+        # 1. Prepare data for the MODEL (keep as numbers)
+        active = model_handler.active()
+        input_data = active.prepare_input(values, ids)
+
+        # The prediction for this exact form is normally still cached from the
+        # Predict click; on a miss (form edited since) it is rescored so the
+        # report never pairs inputs with another form's result
+        result = model_handler.predict(input_data, active)
+
+        # 2. Store what the report shows unless this (input, result) is stored already
+        key = ensure_report(input_data, result)
+
+        # n_clicks makes every click a new value, so repeated downloads still fire
+        return {'url': app.get_relative_path(report_path(key)), 'n': n_clicks}
+
+    if background_manager is not None:
+        @app.callback(
+            *report_dependencies,
+            background=True,
+            manager=background_manager,
+            running=[(Output("btn-download-pdf", "disabled"), True, False)],
+            interval=CHAT_POLL_INTERVAL,
+            prevent_initial_call=True
+        )
+        def download_report(n_clicks, values, ids):
+            return prepare_report(n_clicks, values, ids)
+    else:
+        @app.callback(*report_dependencies, prevent_initial_call=True)
+        @instrument_callback
+        def download_report(n_clicks, values, ids):
+            return prepare_report(n_clicks, values, ids)
 
     # Updated Toggle Callback (Handles Visibility)
     @app.callback(
@@ -164,6 +119,7 @@ def register_callbacks(app):
         Input("close-chat-btn", "n_clicks"),
         [State("chat-canvas", "is_open"), State("chat-btn-wrapper", "style")],
     )
+    @instrument_callback
     def toggle_chat(n_clicks, close_btn, is_open, current_style):
         if n_clicks or close_btn:
             # If currently open, we are closing it -> Show button
@@ -178,56 +134,69 @@ def register_callbacks(app):
 
         return is_open, current_style
 
-    # Handle Message Sending (Updated)
-    @app.callback(
-        [Output("chat-history", "children"), Output("user-msg", "value")],
+    # Handle Message Sending
+    # The conversation lives server-side (Utils/chat_history.py) under a
+    # per-page session id; requests carry only the new message and the
+    # response only appends the two new bubbles
+    chat_dependencies = (
+        [Output("chat-history", "children"), Output("user-msg", "value"),
+         Output("chat-session", "data")],
         [Input("send-msg", "n_clicks"), Input("user-msg", "n_submit")],
         State("user-msg", "value"),
-        State("chat-history", "children"),
+        State("chat-session", "data"),
         State({'type': 'input-field', 'index': ALL}, 'value'),
         State({'type': 'input-field', 'index': ALL}, 'id'),
-        prevent_initial_call=True
     )
-    def update_chat(n_clicks, n_submit, msg, history, form_values, form_ids):
+
+    def answer_chat(set_progress, msg, session_id, form_values, form_ids):
         # Check if message is empty
         if not msg:
-            return dash.no_update, ""
-
-        if history is None:
-            history = []
+            return dash.no_update, "", dash.no_update
 
-        # 1. Style User Message (Align Right)
-        user_bubble = html.Div([
-            html.Div(msg, style={
-                "backgroundColor": "#e0e7ff", "color": "#333",
-                "padding": "10px 15px", "borderRadius": "15px 15px 0 15px",
-                "maxWidth": "85%", "alignSelf": "flex-end", "display": "inline-block"
-            })
-        ], style={"textAlign": "right", "width": "100%"})
+        session_id = session_id or uuid.uuid4().hex
+        user_bubble = create_user_bubble(msg)
 
-        history.append(user_bubble)
-
-        # 2. Get Context
+        # Patient context from the form
         patient_context = {id_obj['index']: val for val, id_obj in zip(form_values, form_ids) if val}
 
-        # 3. Call Gemini
-        ai_text = get_chat_response(msg, patient_context)
-
-        # 4. Style AI Message (Align Left)
-        ai_bubble = html.Div([
-            html.Div([
-                html.I(className="fa-solid fa-robot me-2", style={"color": "var(--primary)"}),
-                html.Span(ai_text)
-            ], style={
-                "backgroundColor": "#f3f4f6", "color": "#1f2937",
-                "padding": "10px 15px", "borderRadius": "15px 15px 15px 0",
-                "maxWidth": "90%", "display": "inline-block"
-            })
-        ], style={"textAlign": "left", "width": "100%"})
-
-        history.append(ai_bubble)
-
-        return history, ""
+        # Stream the reply into chat-stream as it arrives, then move it into the history
+        ai_text = ""
+        try:
+            for chunk in stream_chat_response(msg, patient_context, history=prompt_history(session_id)):
+                ai_text += chunk
+                if set_progress is not None:
+                    # One value per progress output: the chat-stream children
+                    set_progress([[user_bubble, create_ai_bubble(ai_text + " ▍")]])
+        except ChatBackendError as e:
+            # Shown in the chat, but a failed exchange stays out of the history
+            ai_text += str(e)
+        else:
+            record_turn(session_id, msg, ai_text)
+
+        new_bubbles = Patch()
+        new_bubbles.extend([user_bubble, create_ai_bubble(ai_text)])
+        return new_bubbles, "", session_id
+
+    if background_manager is not None:
+        # Runs as a queued background job, so the LLM roundtrip never holds a web worker
+        @app.callback(
+            *chat_dependencies,
+            background=True,
+            manager=background_manager,
+            progress=[Output("chat-stream", "children")],
+            # Empty the stream area once the job ends: the finished exchange is in chat-history
+            progress_default=[[]],
+            running=[(Output("send-msg", "disabled"), True, False)],
+            interval=CHAT_POLL_INTERVAL,
+            prevent_initial_call=True
+        )
+        def update_chat(set_progress, n_clicks, n_submit, msg, session_id, form_values, form_ids):
+            return answer_chat(set_progress, msg, session_id, form_values, form_ids)
+    else:
+        @app.callback(*chat_dependencies, prevent_initial_call=True)
+        @instrument_callback
+        def update_chat(n_clicks, n_submit, msg, session_id, form_values, form_ids):
+            return answer_chat(None, msg, session_id, form_values, form_ids)
 
     # Handle Suggestion Chips
     @app.callback(
@@ -236,17 +205,18 @@ def register_callbacks(app):
         [State("sugg-1", "children"), State("sugg-2", "children"), State("sugg-3", "children")],
         prevent_initial_call=True
     )
+    @instrument_callback
     def populate_suggestion(n1, n2, n3, t1, t2, t3):
         ctx = dash.callback_context
         if not ctx.triggered:
             return dash.no_update
 
-        # Get the text of the clicked badge
+        # Get the text of the clicked badge (its children are [icon, text])
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        if button_id == "sugg-1": return t1
-        if button_id == "sugg-2": return t2
-        if button_id == "sugg-3": return t3
-        return ""
+        children = {"sugg-1": t1, "sugg-2": t2, "sugg-3": t3}.get(button_id)
+        if isinstance(children, list):
+            return "".join(c for c in children if isinstance(c, str))
+        return children or ""
 
     # Smooth scroll callback for "Learn More" button
     app.clientside_callback(
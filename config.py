@@ -1,6 +1,101 @@
 # config.py - Feature definitions and configuration
 
-MODEL_FILE = 'models/alzheimers_model_data.pkl'
+import os
+
+MODEL_FILE = os.environ.get('MODEL_FILE', 'models/alzheimers_model_data.pkl')
+
+# Training (python -m Utils.training): the raw dataset, parallel CV fits
+# (-1 = all cores) and the joblib.Memory cache that lets re-runs skip
+# unchanged steps ('' disables it)
+RAW_DATA_FILE = os.environ.get('RAW_DATA_FILE', 'data/alzheimers_disease_data.csv')
+# Parsed float32 copy of RAW_DATA_FILE (python -m Utils.preprocessing),
+# rebuilt when the raw file's hash changes
+PROCESSED_DATA_DIR = os.environ.get('PROCESSED_DATA_DIR', 'data/processed')
+TRAINING_N_JOBS = int(os.environ.get('TRAINING_N_JOBS', '-1'))
+TRAINING_CACHE_DIR = os.environ.get('TRAINING_CACHE_DIR', 'cache/training')
+
+# How the shared ModelHandler loads the model once the app starts it
+# (model_handler.start() in app.py; other importers such as the scoring CLIs
+# always load on first use):
+#   'background' - start loading on a thread, pages serve immediately
+#   'lazy'       - load on the first prediction
+#   'eager'      - load synchronously at startup (blocks worker boot)
+MODEL_LOAD_MODE = os.environ.get('MODEL_LOAD_MODE', 'background')
+
+# Seconds a prediction waits for a model that is still loading
+MODEL_READY_TIMEOUT = float(os.environ.get('MODEL_READY_TIMEOUT', '2'))
+
+# Single-prediction cache keyed on the encoded, feature-ordered input vector
+# (size 0 disables it; entries expire after TTL seconds, 0 = never)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '1024'))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '3600'))
+
+# Callback, request and model timings at GET /metrics (Prometheus text
+# format, per process); 0 leaves every function unwrapped
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Largest batch accepted by POST /api/v1/predict
+API_MAX_BATCH = int(os.environ.get('API_MAX_BATCH', '10000'))
+
+# Versioned model registry for zero-downtime rollouts. Each entry is
+# <version>.pkl, <version>.npz or a compiled <version>/ directory; an optional
+# CURRENT file names the version to serve (default: the last one by name) and
+# an optional golden.json holds the inputs every candidate must pass.
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'models/registry')
+
+# Seconds between registry checks (0 disables the watcher)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '10'))
+
+# Token for the /admin/model endpoints (unset disables them)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Chat assistant backend: 'gemini' (needs GOOGLE_API_KEY) or 'fake', an
+# offline stand-in that streams a canned reply for development and load tests
+CHAT_BACKEND = os.environ.get('CHAT_BACKEND', 'gemini')
+CHAT_MODEL = os.environ.get('CHAT_MODEL', 'gemini-2.5-flash')
+
+# Seconds the fake backend waits per streamed word, to mimic LLM latency
+CHAT_FAKE_TOKEN_DELAY = float(os.environ.get('CHAT_FAKE_TOKEN_DELAY', '0.05'))
+
+# Chat replies run as Dash background jobs queued in this diskcache
+# directory (shared by all workers); the browser polls for new tokens
+# every CHAT_POLL_INTERVAL milliseconds. An empty CHAT_JOB_DIR answers in
+# the request instead, holding a web worker for the whole reply.
+CHAT_JOB_DIR = os.environ.get('CHAT_JOB_DIR', 'cache/chat-jobs')
+CHAT_POLL_INTERVAL = int(os.environ.get('CHAT_POLL_INTERVAL', '250'))
+
+# Chat reply cache keyed on (normalized question, relevant patient data).
+# Kept in this diskcache directory so every worker and chat job shares it
+# (in-process LRU when empty or diskcache is missing); size 0 disables it.
+CHAT_CACHE_DIR = os.environ.get('CHAT_CACHE_DIR', 'cache/chat-replies')
+CHAT_CACHE_SIZE = int(os.environ.get('CHAT_CACHE_SIZE', '2048'))
+CHAT_CACHE_TTL = float(os.environ.get('CHAT_CACHE_TTL', '86400'))
+
+# Server-side chat history, one record per browser session, shared through
+# this diskcache directory like the reply cache. At most CHAT_HISTORY_SESSIONS
+# sessions (least recently used evicted) idle for at most CHAT_HISTORY_TTL
+# seconds; each keeps its last CHAT_HISTORY_TURNS exchanges. Prompts quote the
+# last CHAT_PROMPT_TURNS exchanges and summarize the earlier ones.
+CHAT_HISTORY_DIR = os.environ.get('CHAT_HISTORY_DIR', 'cache/chat-history')
+CHAT_HISTORY_SESSIONS = int(os.environ.get('CHAT_HISTORY_SESSIONS', '10000'))
+CHAT_HISTORY_TTL = float(os.environ.get('CHAT_HISTORY_TTL', '86400'))
+CHAT_HISTORY_TURNS = int(os.environ.get('CHAT_HISTORY_TURNS', '50'))
+CHAT_PROMPT_TURNS = int(os.environ.get('CHAT_PROMPT_TURNS', '4'))
+
+# What each PDF report shows, keyed by an HMAC of (model input, prediction)
+# and rendered with the current date when downloaded, kept in this diskcache
+# directory so the background job that stores a report and the worker that
+# serves it share it (in-process LRU when empty or diskcache is missing, which
+# only works with a single worker and no background jobs).
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', 'cache/reports')
+REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', '1024'))
+REPORT_CACHE_TTL = float(os.environ.get('REPORT_CACHE_TTL', '86400'))
+# Key for the report URL HMAC. When unset, a random one is created once in
+# REPORT_SECRET_FILE and shared by every process on the host (a per-process
+# random key when that is empty too). Set the same REPORT_SECRET on every
+# host that serves reports from a shared cache.
+REPORT_SECRET = os.environ.get('REPORT_SECRET', '')
+REPORT_SECRET_FILE = os.environ.get('REPORT_SECRET_FILE', 'cache/report_secret')
 
 FEATURE_GROUPS = {
     "Patient Demographics": {
@@ -0,0 +1,48 @@
+# gunicorn.conf.py - Picked up automatically by `gunicorn app:server` (see Procfile)
+
+import os
+
+# Import the app once in the master and fork the workers from it, so every
+# worker shares the loaded model's pages instead of loading a private copy.
+# Point MODEL_FILE at a compiled model directory to have the weights
+# memory-mapped from disk as well.
+preload_app = True
+
+# Load synchronously in the master so the model is in place before fork
+os.environ.setdefault('MODEL_LOAD_MODE', 'eager')
+
+
+
+def pre_fork(server, worker):
+    """
+    Fork only once a model load running in the master (MODEL_LOAD_MODE=background)
+    has finished: forked in the middle of its imports, a worker would hold
+    half-initialized joblib/sklearn modules it can never import again.
+    """
+    import sys
+
+    if 'app' not in sys.modules:
+        return
+    from Utils.model_handler import model_handler
+
+    if model_handler.status == 'loading':
+        model_handler.ensure_loaded()
+
+
+def post_fork(server, worker):
+    """
+    Restart in each worker what the fork did not copy: threads. Only here,
+    not in an os.register_at_fork hook, so scoring and report pools and
+    background jobs forked from a worker do not start them too.
+    """
+    import sys
+
+    if 'app' not in sys.modules:
+        # Without preload_app the worker imports the app itself, after this
+        return
+    from Utils.model_handler import model_handler
+
+    model_handler.after_fork()
+    registry = sys.modules['app'].server.extensions.get('model_registry')
+    if registry is not None:
+        registry.after_fork()